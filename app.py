@@ -1,27 +1,356 @@
-from flask import Flask, request, render_template_string, jsonify
+from flask import Flask, Response, g, request, jsonify
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
+import atexit
+import codecs
+import copyreg
+import dataclasses
 import datetime
-from dataclasses import dataclass, asdict
-from typing import List, Optional, Dict, Any, Tuple
+import fcntl
+import gc
+import gzip
+import hashlib
+import itertools
+import json
+import math
+import mmap
+import multiprocessing
+import pickle
+import random
+import re
+import string
+import struct
+import sys
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from functools import lru_cache
+from operator import itemgetter
+from types import MappingProxyType
+from dataclasses import dataclass, field, replace
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from typing import List, Optional, Dict, Any, Tuple, Mapping, FrozenSet, NamedTuple, Iterable, Iterator, Set
 
 app = Flask(__name__)
 
-@dataclass
+# --- Configuration du flux ---
+FEED_URL = os.environ.get(
+    "FEED_URL",
+    "https://1xbet.com/LiveFeed/Get1x2_VZip?sports=85&count=50&lng=fr&gr=70&mode=4&country=96&getEmpty=true",
+)
+# Flux supplémentaires récupérés en parallèle, séparés par « ; » : paramètres remplaçant ceux de FEED_URL
+# (ex. "sports=1&lng=en&country=1;sports=85&mode=4") ou URL complète. Vide : FEED_URL seul.
+FEED_SOURCES = os.environ.get("FEED_SOURCES", "")
+# Intervalle (secondes) entre deux rafraîchissements du flux par le poller
+FEED_REFRESH_INTERVAL = float(os.environ.get("FEED_REFRESH_INTERVAL", 20))
+# Âge maximal (secondes) des derniers matchs d'une source en échec, réutilisés à sa place ; au-delà, ils sont retirés
+FEED_SOURCE_MAX_STALENESS = float(os.environ.get("FEED_SOURCE_MAX_STALENESS", 3 * FEED_REFRESH_INTERVAL))
+# Attente maximale du premier snapshot lors d'une requête à froid
+FEED_STARTUP_TIMEOUT = float(os.environ.get("FEED_STARTUP_TIMEOUT", 15))
+# Client HTTP : délais (secondes), réessais bornés et disjoncteur
+FEED_CONNECT_TIMEOUT = float(os.environ.get("FEED_CONNECT_TIMEOUT", 3.05))
+FEED_READ_TIMEOUT = float(os.environ.get("FEED_READ_TIMEOUT", 10))
+FEED_MAX_RETRIES = int(os.environ.get("FEED_MAX_RETRIES", 2))
+FEED_RETRY_BACKOFF = float(os.environ.get("FEED_RETRY_BACKOFF", 0.5))
+FEED_POOL_SIZE = int(os.environ.get("FEED_POOL_SIZE", 10))
+FEED_BREAKER_THRESHOLD = int(os.environ.get("FEED_BREAKER_THRESHOLD", 5))
+FEED_BREAKER_COOLDOWN = float(os.environ.get("FEED_BREAKER_COOLDOWN", 60))
+# Flux SSE : intervalle des messages de maintien et durée maximale d'une connexion (le navigateur se reconnecte)
+SSE_HEARTBEAT = float(os.environ.get("SSE_HEARTBEAT", 15))
+SSE_MAX_DURATION = float(os.environ.get("SSE_MAX_DURATION", 300))
+# Flux SSE ouverts simultanément par processus : chacun occupe un thread du serveur pendant toute sa durée.
+# Au-delà, /api/stream répond 503 et la page se rabat sur le rafraîchissement périodique (0 : jamais de flux)
+SSE_MAX_STREAMS = int(os.environ.get("SSE_MAX_STREAMS", 8))
+# Cache des réponses JSON sérialisées (entrées) et taille minimale d'un corps compressé en gzip
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 256))
+# Cache des pages HTML rendues (entrées), par version du snapshot, filtres et page
+HTML_CACHE_SIZE = int(os.environ.get("HTML_CACHE_SIZE", 128))
+GZIP_MIN_SIZE = int(os.environ.get("GZIP_MIN_SIZE", 500))
+# Analyse des cotes : écart relatif minimal au consensus pour signaler une "value", et taille minimale du consensus
+VALUE_THRESHOLD = float(os.environ.get("VALUE_THRESHOLD", 0.05))
+VALUE_MIN_SAMPLES = int(os.environ.get("VALUE_MIN_SAMPLES", 3))
+# Historique des cotes sur disque (désactivé par défaut : dossier à fournir, hors de l'arborescence du code),
+# taille d'un segment (enregistrements) et segments conservés
+ODDS_HISTORY_DIR = os.environ.get("ODDS_HISTORY_DIR", "")
+ODDS_HISTORY_SEGMENT_RECORDS = int(os.environ.get("ODDS_HISTORY_SEGMENT_RECORDS", 262144))
+ODDS_HISTORY_MAX_SEGMENTS = int(os.environ.get("ODDS_HISTORY_MAX_SEGMENTS", 16))
+# Lecture du flux en continu : les matchs sont analysés un par un pendant le téléchargement
+FEED_STREAMING = os.environ.get("FEED_STREAMING", "0") not in ("0", "false", "no")
+FEED_STREAM_CHUNK = int(os.environ.get("FEED_STREAM_CHUNK", 65536))
+# Analyse parallèle des matchs dans un pool de processus (0 ou 1 : analyse en série dans le processus),
+# seulement au-delà de FEED_PARSE_MIN_MATCHES matchs à analyser ; les matchs sont envoyés par lots de
+# FEED_PARSE_CHUNK au plus
+FEED_PARSE_WORKERS = int(os.environ.get("FEED_PARSE_WORKERS", 0))
+FEED_PARSE_MIN_MATCHES = int(os.environ.get("FEED_PARSE_MIN_MATCHES", 1000))
+FEED_PARSE_CHUNK = int(os.environ.get("FEED_PARSE_CHUNK", 500))
+# Profilage des requêtes (désactivé par défaut) : en-tête X-Profile ou paramètre ?profile, et/ou une fraction
+# des requêtes tirée au hasard ; intervalle d'échantillonnage des piles, profils gardés et dossier des fichiers .folded
+PROFILE_ENABLED = os.environ.get("PROFILE_ENABLED", "0") not in ("0", "false", "no")
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", 0.001))
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", 50))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "profiles"))
+# Snapshot partagé entre workers (vide pour désactiver ; un tmpfs comme /dev/shm/virtual-feed est conseillé) :
+# un seul processus récupère le flux, les autres relisent le snapshot publié toutes les SHARED_SNAPSHOT_POLL secondes
+SHARED_SNAPSHOT_DIR = os.environ.get("SHARED_SNAPSHOT_DIR", "")
+SHARED_SNAPSHOT_POLL = float(os.environ.get("SHARED_SNAPSHOT_POLL", 0.5))
+# Âge maximal (secondes) du snapshot partagé repris par un follower : un fichier plus ancien (laissé par un
+# lancement précédent, ou dont l'écrivain ne rafraîchit plus) est ignoré
+SHARED_SNAPSHOT_MAX_AGE = float(os.environ.get("SHARED_SNAPSHOT_MAX_AGE", 3 * FEED_REFRESH_INTERVAL))
+# Mise à jour rapide des matchs en direct, un par un : URL d'un match ({id} remplacé par son identifiant,
+# ex. "https://1xbet.com/LiveFeed/GetGameZip?id={id}&lng=fr", réponse {"Value": {match}} au format du flux ;
+# vide pour désactiver). Intervalle de départ, allongé (facteur FEED_LIVE_BACKOFF) tant que le match ne change
+# pas, jusqu'à FEED_LIVE_MAX_INTERVAL. Le flux complet (matchs à venir, nouveaux matchs) reste rafraîchi toutes
+# les FEED_REFRESH_INTERVAL secondes, qu'on peut alors allonger.
+FEED_GAME_URL = os.environ.get("FEED_GAME_URL", "")
+FEED_LIVE_INTERVAL = float(os.environ.get("FEED_LIVE_INTERVAL", 3))
+FEED_LIVE_MAX_INTERVAL = float(os.environ.get("FEED_LIVE_MAX_INTERVAL", 20))
+FEED_LIVE_BACKOFF = float(os.environ.get("FEED_LIVE_BACKOFF", 2))
+# Au-delà de ce nombre de matchs à mettre à jour en même temps, une seule récupération du flux complet les remplace
+FEED_LIVE_BATCH = int(os.environ.get("FEED_LIVE_BATCH", 8))
+# Matchs terminés retirés du snapshot après ce délai (secondes) ; 0 : gardés tant que le flux les fournit
+FEED_FINISHED_GRACE = float(os.environ.get("FEED_FINISHED_GRACE", 0))
+# Dernier snapshot conservé sur disque (désactivé par défaut : dossier à fournir, hors de l'arborescence du code) :
+# un worker qui démarre sert aussitôt ce snapshot s'il date de moins de SNAPSHOT_MAX_AGE secondes, le temps que
+# le premier rafraîchissement aboutisse ; écrit au plus une fois toutes les SNAPSHOT_PERSIST_INTERVAL secondes
+# et à l'arrêt du processus
+SNAPSHOT_PERSIST_DIR = os.environ.get("SNAPSHOT_PERSIST_DIR", "")
+SNAPSHOT_PERSIST_INTERVAL = float(os.environ.get("SNAPSHOT_PERSIST_INTERVAL", 300))
+SNAPSHOT_MAX_AGE = float(os.environ.get("SNAPSHOT_MAX_AGE", 1800))
+# Permet de désactiver le poller (benchmarks, scripts) : le snapshot est alors publié à la main
+FEED_POLLER_ENABLED = os.environ.get("FEED_POLLER_ENABLED", "1") not in ("0", "false", "no")
+# Rafraîchissement à la demande (sans thread de fond) : une requête qui trouve un snapshot plus vieux que
+# FEED_REFRESH_INTERVAL relance la récupération, partagée par toutes les requêtes concurrentes
+FEED_ON_DEMAND = os.environ.get("FEED_ON_DEMAND", "0") not in ("0", "false", "no")
+# Récupérations partagées (single-flight) : requêtes en attente d'une même récupération et attente maximale (secondes)
+FEED_FLIGHT_MAX_WAITERS = int(os.environ.get("FEED_FLIGHT_MAX_WAITERS", 256))
+FEED_FLIGHT_TIMEOUT = float(os.environ.get("FEED_FLIGHT_TIMEOUT", 15))
+
+# --- Métriques (format texte Prometheus, sans dépendance) ---
+# Bornes des histogrammes : durées en secondes, tailles en octets
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+def _label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _label_text(names: Tuple[str, ...], values: Tuple[Any, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _metric_value(value: float) -> str:
+    return "+Inf" if value == math.inf else repr(float(value))
+
+class Metric:
+    """Série de valeurs par combinaison d'étiquettes ; `function` (appelée à la collecte) remplace les valeurs stockées."""
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), function=None):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.function = function
+        self._values: Dict[Tuple[Any, ...], Any] = {}
+        self._lock = threading.Lock()
+        metrics.register(self)
+
+    def samples(self) -> List[str]:
+        values = self.function() if self.function is not None else dict(self._values)
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [f"{self.name}{_label_text(self.labelnames, labels)} {_metric_value(value)}" for labels, value in values.items()]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels: Any, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: Any) -> None:
+        self._values[labels] = value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: Any) -> None:
+        # Compteurs par intervalle (non cumulés) ; le cumul n'est fait qu'à la collecte
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, *labels: Any) -> "Timer":
+        return Timer(self, labels)
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            values = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                bucket = 'le="%s"' % _metric_value(bound)
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, labels, bucket)} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, labels)} {_metric_value(total)}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, labels)} {cumulative}")
+        return lines
+
+class Timer:
+    """Chronomètre d'un bloc `with`, enregistré dans un histogramme à la sortie (même en cas d'exception)."""
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: Tuple[Any, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = Histogram("feed_stage_seconds", "Durée de chaque étape (fetch, decode, odds, parse_match, predictions, snapshot, render, serialize).", ("stage",))
+FETCH_SECONDS = Histogram("feed_fetch_seconds", "Durée de récupération complète d'une source du flux (réseau et décodage).", ("source",))
+FETCH_ERRORS = Counter("feed_fetch_errors_total", "Échecs de récupération d'une source, par type d'exception.", ("source", "type"))
+PAYLOAD_BYTES = Histogram("feed_payload_bytes", "Taille des réponses du flux, en octets.", buckets=SIZE_BUCKETS)
+PARSE_ERRORS = Counter("feed_parse_errors_total", "Matchs (ou fiches détaillées) rejetés à l'analyse, par type d'exception.", ("stage", "type"))
+MATCHES_PARSED = Counter("feed_matches_parsed_total", "Matchs analysés (nouveaux ou modifiés).")
+MATCHES_REUSED = Counter("feed_matches_reused_total", "Matchs inchangés repris du snapshot précédent.")
+REFRESH_MATCHES = Gauge("feed_refresh_matches", "Matchs analysés et repris lors du dernier rafraîchissement.", ("kind",))
+FLIGHT_CALLS = Counter("feed_flight_calls_total", "Appels aux récupérations partagées : lancés (leader), partagés, refusés (trop d'attente) ou expirés.", ("flight", "result"))
+LIVE_FETCHES = Counter("feed_live_fetches_total", "Mises à jour individuelles des matchs en direct, par résultat (changed, unchanged, error).", ("result",))
+HISTORY_ERRORS = Counter("odds_history_errors_total", "Échecs d'enregistrement de l'historique des cotes.", ("type",))
+CACHE_REQUESTS = Counter("cache_requests_total", "Lectures des caches de réponses et d'analyses, par résultat (hit, miss).", ("cache", "result"))
+HTTP_SECONDS = Histogram("http_request_duration_seconds", "Durée de traitement des requêtes HTTP, par route.", ("endpoint",))
+HTTP_REQUESTS = Counter("http_requests_total", "Requêtes HTTP, par route et code de statut.", ("endpoint", "status"))
+SSE_STREAMS = Gauge("sse_streams", "Flux SSE ouverts dans ce processus.")
+
+ODDS_LABELS = {1: '1', 2: '2', 3: 'X'}
+
+@lru_cache(maxsize=8192)
+def format_match_time(match_ts: int) -> str:
+    return datetime.datetime.utcfromtimestamp(match_ts).strftime('%d/%m/%Y %H:%M') if match_ts else "–"
+
 class MatchData:
-    team1: str
-    team2: str
-    score1: int
-    score2: int
-    league: str
-    sport: str
-    status: str
-    datetime: str
-    temp: str
-    humid: str
-    odds: List[str]
-    prediction: str
-    id: Optional[int]
+    """Ligne de la liste des matchs : attributs à slots, chaînes répétées internées, cotes gardées en nombres.
+
+    Le texte affiché (date, cotes) n'est produit qu'au rendu, et la ligne JSON n'est sérialisée qu'une fois.
+    """
+    __slots__ = ("team1", "team2", "score1", "score2", "league", "sport", "status", "start", "temp", "humid",
+                 "odds", "prediction", "id", "_json")
+    FIELDS = ("team1", "team2", "score1", "score2", "league", "sport", "status", "datetime", "temp", "humid",
+              "odds", "prediction", "id")
+
+    def __init__(self, team1: str, team2: str, score1: int, score2: int, league: str, sport: str, status: str,
+                 start: int, temp: str, humid: str, odds: Tuple[Tuple[Any, Any], ...], prediction: str,
+                 id: Optional[int]):
+        self.team1 = team1
+        self.team2 = team2
+        self.score1 = score1
+        self.score2 = score2
+        self.league = sys.intern(league) if type(league) is str else league
+        self.sport = sys.intern(sport)
+        self.status = sys.intern(status)
+        # Horodatage de début (secondes) ; (T, C) des cotes 1X2
+        self.start = start
+        self.temp = temp
+        self.humid = humid
+        self.odds = odds
+        self.prediction = prediction
+        self.id = id
+        self._json: Optional[str] = None
+
+    @property
+    def datetime(self) -> str:
+        return format_match_time(self.start)
+
+    @property
+    def odds_display(self) -> List[str]:
+        return [f"{ODDS_LABELS[t]}: {cote}" for t, cote in self.odds] or ["Pas de cotes disponibles"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "team1": self.team1,
+            "team2": self.team2,
+            "score1": self.score1,
+            "score2": self.score2,
+            "league": self.league,
+            "sport": self.sport,
+            "status": self.status,
+            "datetime": self.datetime,
+            "temp": self.temp,
+            "humid": self.humid,
+            "odds": self.odds_display,
+            "prediction": self.prediction,
+            "id": self.id,
+        }
+
+    def to_json(self) -> str:
+        # Même forme que jsonify (clés triées, ASCII, compact), calculée une fois par ligne
+        if self._json is None:
+            self._json = json.dumps(self.to_dict(), sort_keys=True, separators=(",", ":"))
+        return self._json
+
+    def _key(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.__slots__[:-1])
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, MatchData):
+            return NotImplemented
+        return self is other or self._key() == other._key()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"MatchData(id={self.id!r}, team1={self.team1!r}, team2={self.team2!r})"
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__[:-1]}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._json = None
 
 # --- Fonctions utilitaires ---
 def detect_sport(league_name: str) -> str:
@@ -74,23 +403,83 @@ def parse_status(match: dict, minute: Optional[int], score1: int, score2: int) -
         is_upcoming = True
     return {"statut": statut, "is_live": is_live, "is_finished": is_finished, "is_upcoming": is_upcoming}
 
-def parse_odds(match: dict) -> List[str]:
-    odds_data = []
+# --- Extraction des cotes (un seul passage par match) ---
+# Plage de cotes retenue pour les prédictions
+COTE_MIN = 1.399
+COTE_MAX = 3
+
+class MatchOdds(NamedTuple):
+    # Cotes 1X2 de E (T, C), dans l'ordre du flux
+    main: Tuple[Tuple[Any, Any], ...]
+    # Toutes les cotes numériques de E puis AE[].ME en tableaux parallèles, triés par cote (tri stable)
+    groups: Tuple[Any, ...]
+    types: Tuple[Any, ...]
+    params: Tuple[Any, ...]
+    prices: Tuple[float, ...]
+    alternative: Tuple[bool, ...]
+    # Bornes [band_start, band_end) des cotes comprises entre COTE_MIN et COTE_MAX
+    band_start: int
+    band_end: int
+
+def extract_odds(match: dict) -> MatchOdds:
+    main = []
+    rows = []
     for o in match.get("E", []):
-        if o.get("G") == 1 and o.get("T") in [1, 2, 3] and o.get("C") is not None:
-            odds_data.append(f"{ {1: '1', 2: '2', 3: 'X'}[o.get('T')] }: {o.get('C')}")
+        cote = o.get("C")
+        if cote is None:
+            continue
+        groupe = o.get("G")
+        t = o.get("T")
+        if groupe == 1 and t in (1, 2, 3):
+            main.append((t, cote))
+        if isinstance(cote, (int, float)):
+            rows.append((cote, groupe, t, o.get("P"), False))
+    for ae in match.get("AE", []):
+        groupe = ae.get("G")
+        for o in ae.get("ME", []):
+            cote = o.get("C")
+            if isinstance(cote, (int, float)):
+                rows.append((cote, groupe, o.get("T"), o.get("P"), True))
+    rows.sort(key=itemgetter(0))
+    prices, groups, types, params, alternative = zip(*rows) if rows else ((), (), (), (), ())
+    return MatchOdds(
+        main=tuple(main),
+        groups=groups,
+        types=types,
+        params=params,
+        prices=prices,
+        alternative=alternative,
+        band_start=bisect_left(prices, COTE_MIN),
+        band_end=bisect_right(prices, COTE_MAX),
+    )
+
+def _number(value) -> float:
+    return value if type(value) is int or type(value) is float else math.nan
+
+def odds_matrix(odds: MatchOdds) -> np.ndarray:
+    """Cotes du match en tableau (n, 4) : groupe, type, paramètre, cote ; NaN pour les valeurs non numériques."""
+    return np.array(
+        [(_number(g), _number(t), _number(p), c) for g, t, p, c in zip(odds.groups, odds.types, odds.params, odds.prices)],
+        dtype=np.float64,
+    ).reshape(-1, 4)
+
+def parse_odds(match: dict, odds: Optional[MatchOdds] = None) -> List[str]:
+    if odds is None:
+        odds = extract_odds(match)
+    odds_data = [f"{ODDS_LABELS[t]}: {cote}" for t, cote in odds.main]
     if not odds_data:
         odds_data = ["Pas de cotes disponibles"]
     return odds_data
 
-def get_prediction(match: dict, team1: str, team2: str) -> str:
+def get_prediction(match: dict, team1: str, team2: str, odds: Optional[MatchOdds] = None) -> str:
+    if odds is None:
+        odds = extract_odds(match)
     best = None
     best_type = None
-    for o in match.get("E", []):
-        if o.get("G") == 1 and o.get("T") in [1, 2, 3] and o.get("C") is not None:
-            if best is None or o.get("C") < best:
-                best = o.get("C")
-                best_type = o.get("T")
+    for t, cote in odds.main:
+        if best is None or cote < best:
+            best = cote
+            best_type = t
     if best_type == 1:
         return f"{team1} gagne"
     elif best_type == 2:
@@ -99,133 +488,164 @@ def get_prediction(match: dict, team1: str, team2: str) -> str:
         return "Match nul"
     return "–"
 
-def traduire_pari(groupe, t, param, team1, team2):
-    def param_str(p):
-        if p in [None, -1.0, ""]:
-            return None
-        try:
-            return str(float(p)).rstrip('0').rstrip('.') if '.' in str(p) else str(p)
-        except:
-            return str(p)
+# --- Libellés des paris ---
+# (G, T) -> modèle de libellé ; T=None couvre tous les types du groupe.
+# Champs disponibles : {team1}, {team2}, {p} (paramètre formaté, "?" si absent), {t}, {groupe}
+BET_LABELS: Dict[Tuple[Any, Any], str] = {
     # Paris principaux 1X2 virtuels
-    if groupe == 1:
-        if t == 1:
-            return f"Victoire FIFA {team1} (virtuel)"
-        elif t == 2:
-            return f"Victoire FIFA {team2} (virtuel)"
-        elif t == 3:
-            return "Match nul (virtuel)"
-        elif t == 4:
-            return f"Double chance virtuel : {team1} ou Nul"
-        elif t == 5:
-            return f"Double chance virtuel : {team2} ou Nul"
-        elif t == 6:
-            return f"Double chance virtuel : {team1} ou {team2}"
+    (1, 1): "Victoire FIFA {team1} (virtuel)",
+    (1, 2): "Victoire FIFA {team2} (virtuel)",
+    (1, 3): "Match nul (virtuel)",
+    (1, 4): "Double chance virtuel : {team1} ou Nul",
+    (1, 5): "Double chance virtuel : {team2} ou Nul",
+    (1, 6): "Double chance virtuel : {team1} ou {team2}",
     # Double chance virtuel (groupe 8, T=4 ou 6)
-    if groupe == 8:
-        if t == 4:
-            return f"Double chance virtuel : {team1} ou Nul"
-        elif t == 6:
-            return f"Double chance virtuel : {team1} ou {team2}"
-    # Over/Under, Handicap, etc. virtuels
-    if groupe in [2, 8, 15, 62]:
-        if t == 7:
-            p = param_str(param)
-            return f"Plus de {p if p else '?'} buts (simulation)"
-        elif t == 8:
-            p = param_str(param)
-            return f"Moins de {p if p else '?'} buts (simulation)"
-        elif t == 9:
-            p = param_str(param)
-            return f"Handicap virtuel {team1} +{p if p else '?'}"
-        elif t == 10:
-            p = param_str(param)
-            return f"Handicap virtuel {team2} -{p if p else '?'}"
-        elif t == 11:
-            return f"Les deux équipes marquent (virtuel) : Oui"
-        elif t == 12:
-            return f"Les deux équipes marquent (virtuel) : Non"
-        elif t == 13 or t == 14:
-            p = param_str(param)
-            return f"Handicap asiatique virtuel {p if p else '?'}"
+    (8, 4): "Double chance virtuel : {team1} ou Nul",
+    (8, 6): "Double chance virtuel : {team1} ou {team2}",
     # Score exact virtuel
-    if groupe == 4:
-        p = param_str(param)
-        return f"Score exact virtuel : {p if p else '?'}"
+    (4, None): "Score exact virtuel : {p}",
     # Mi-temps/fin de match virtuel
-    if groupe == 5:
-        if t == 16:
-            return f"{team1} mène à la mi-temps et gagne (virtuel)"
-        elif t == 17:
-            return f"{team2} mène à la mi-temps et gagne (virtuel)"
-        elif t == 18:
-            return f"Nul à la mi-temps, {team1} gagne (virtuel)"
-        elif t == 19:
-            return f"Nul à la mi-temps, {team2} gagne (virtuel)"
+    (5, 16): "{team1} mène à la mi-temps et gagne (virtuel)",
+    (5, 17): "{team2} mène à la mi-temps et gagne (virtuel)",
+    (5, 18): "Nul à la mi-temps, {team1} gagne (virtuel)",
+    (5, 19): "Nul à la mi-temps, {team2} gagne (virtuel)",
     # Groupes spéciaux virtuels
-    if groupe == 17:
-        if t == 9:
-            p = param_str(param)
-            return f"Handicap virtuel {team1} +{p if p else '?'}"
-        elif t == 10:
-            p = param_str(param)
-            return f"Handicap virtuel {team2} -{p if p else '?'}"
-    if groupe == 19:
-        if t == 180:
-            return f"Pari spécial virtuel (T=180, G=19)"
-        elif t == 181:
-            return f"Pari spécial virtuel (T=181, G=19)"
-    # Cas générique pour tout type inconnu
-    return f"Pari virtuel non reconnu (T={t}, G={groupe})"
-
-def get_all_predictions(match: dict, team1: str, team2: str) -> list:
+    (17, 9): "Handicap virtuel {team1} +{p}",
+    (17, 10): "Handicap virtuel {team2} -{p}",
+    (19, 180): "Pari spécial virtuel (T=180, G=19)",
+    (19, 181): "Pari spécial virtuel (T=181, G=19)",
+}
+# Over/Under, Handicap, etc. virtuels
+for _groupe in (2, 8, 15, 62):
+    BET_LABELS.update({
+        (_groupe, 7): "Plus de {p} buts (simulation)",
+        (_groupe, 8): "Moins de {p} buts (simulation)",
+        (_groupe, 9): "Handicap virtuel {team1} +{p}",
+        (_groupe, 10): "Handicap virtuel {team2} -{p}",
+        (_groupe, 11): "Les deux équipes marquent (virtuel) : Oui",
+        (_groupe, 12): "Les deux équipes marquent (virtuel) : Non",
+        (_groupe, 13): "Handicap asiatique virtuel {p}",
+        (_groupe, 14): "Handicap asiatique virtuel {p}",
+    })
+# Fichier JSON optionnel complétant ou remplaçant la table : [{"G": 2, "T": 7, "label": "..."}, ...]
+BET_LABELS_FILE = os.environ.get("BET_LABELS_FILE", "")
+
+def _format_param(p) -> str:
+    if p in [None, -1.0, ""]:
+        return "?"
+    try:
+        formatted = str(float(p)).rstrip('0').rstrip('.') if '.' in str(p) else str(p)
+    except:
+        formatted = str(p)
+    return formatted if formatted else "?"
+
+# Les paramètres se répètent d'une cote et d'un rafraîchissement à l'autre
+_param_label = lru_cache(maxsize=4096, typed=True)(_format_param)
+
+# Modèle compilé : chaîne constante, ou fonction (team1, team2, param, t, groupe) -> libellé
+_bet_labels: Dict[Tuple[Any, Any], Any] = {}
+
+_LABEL_FIELDS = ("team1", "team2", "p", "t", "groupe")
+# Formes les plus courantes (champs sans format, par indice) : une concaténation évite de réanalyser le modèle à chaque cote
+_PLAIN_LABELS = {
+    (0,): lambda a, b: lambda team1, team2, param, t, groupe, _p=_param_label: a + str(team1) + b,
+    (1,): lambda a, b: lambda team1, team2, param, t, groupe, _p=_param_label: a + str(team2) + b,
+    (2,): lambda a, b: lambda team1, team2, param, t, groupe, _p=_param_label: a + _p(param) + b,
+    (0, 1): lambda a, b, c: lambda team1, team2, param, t, groupe, _p=_param_label: a + str(team1) + b + str(team2) + c,
+    (0, 2): lambda a, b, c: lambda team1, team2, param, t, groupe, _p=_param_label: a + str(team1) + b + _p(param) + c,
+    (1, 2): lambda a, b, c: lambda team1, team2, param, t, groupe, _p=_param_label: a + str(team2) + b + _p(param) + c,
+}
+
+def _compile_label(template: str) -> Any:
+    # Le modèle est validé puis réécrit en champs positionnels ({0} à {4}), jamais évalué.
+    # Les champs formatés sont d'abord convertis en chaîne : leur format est ainsi vérifié dès le chargement.
+    source = []
+    literals = []
+    fields = []
+    plain = True
+    for literal, name, spec, conversion in string.Formatter().parse(template):
+        source.append(literal.replace("{", "{{").replace("}", "}}"))
+        literals.append(literal)
+        if name is None:
+            continue
+        if name not in _LABEL_FIELDS:
+            raise ValueError(f"Champ inconnu {{{name}}} dans le libellé {template!r}")
+        if conversion not in (None, "s", "r", "a"):
+            raise ValueError(f"Conversion !{conversion} refusée dans le libellé {template!r}")
+        if "{" in spec or "}" in spec:
+            raise ValueError(f"Format imbriqué refusé pour {{{name}}} dans le libellé {template!r}")
+        try:
+            format("", spec)
+        except ValueError as e:
+            raise ValueError(f"Format {spec!r} invalide pour {{{name}}} dans le libellé {template!r} : {e}") from None
+        index = _LABEL_FIELDS.index(name)
+        fields.append(index)
+        if spec or conversion:
+            plain = False
+            source.append(f"{{{index}!{conversion or 's'}:{spec}}}")
+        else:
+            source.append(f"{{{index}}}")
+    if not fields:
+        return template.format()
+    fields = tuple(fields)
+    if plain and fields in _PLAIN_LABELS:
+        if len(literals) == len(fields):
+            literals.append("")
+        return _PLAIN_LABELS[fields](*literals)
+    fmt = "".join(source).format
+    if _LABEL_FIELDS.index("p") not in fields:
+        return lambda team1, team2, param, t, groupe, _p=None: fmt(team1, team2, None, t, groupe)
+    return lambda team1, team2, param, t, groupe, _p=_param_label: fmt(team1, team2, _p(param), t, groupe)
+
+def register_bet_labels(labels: Mapping[Tuple[Any, Any], str]) -> None:
+    for key, template in labels.items():
+        _bet_labels[key] = _compile_label(template)
+
+def load_bet_labels(path: str) -> None:
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    register_bet_labels({(entry["G"], entry.get("T")): entry["label"] for entry in entries})
+
+register_bet_labels(BET_LABELS)
+if BET_LABELS_FILE:
+    load_bet_labels(BET_LABELS_FILE)
+
+def traduire_pari(groupe, t, param, team1, team2):
+    try:
+        label = _bet_labels.get((groupe, t))
+        if label is None:
+            label = _bet_labels.get((groupe, None))
+    except TypeError:
+        label = None
+    if label is None:
+        return f"Pari virtuel non reconnu (T={t}, G={groupe})"
+    if type(label) is str:
+        return label
+    try:
+        return label(team1, team2, param, t, groupe)
+    except TypeError:
+        # Paramètre non hachable : formatage sans cache
+        return label(team1, team2, param, t, groupe, _p=_format_param)
+
+def get_all_predictions(match: dict, team1: str, team2: str, odds: Optional[MatchOdds] = None) -> list:
+    # Cotes principales (E) et alternatives (AE/ME) de la plage, déjà triées par cote croissante
+    if odds is None:
+        odds = extract_odds(match)
     predictions = []
-    # Cotes principales (E)
-    for o in match.get("E", []):
-        cote = o.get("C")
-        if cote is not None and 1.399 <= cote <= 3:
-            t = o.get("T")
-            groupe = o.get("G")
-            param = o.get("P") if "P" in o else None
-            label = traduire_pari(groupe, t, param, team1, team2)
-            predictions.append({"resultat": label, "param": param if param not in [None, -1.0] else "", "cote": cote})
-    # Cotes alternatives (AE/ME)
-    for ae in match.get("AE", []):
-        groupe = ae.get("G")
-        for o in ae.get("ME", []):
-            cote = o.get("C")
-            if cote is not None and 1.399 <= cote <= 3:
-                t = o.get("T")
-                param = o.get("P") if "P" in o else None
-                label = traduire_pari(groupe, t, param, team1, team2)
-                predictions.append({"resultat": label, "param": param if param not in [None, -1.0] else "", "cote": cote})
-    # Tri par cote croissante
-    predictions.sort(key=lambda x: x["cote"])
+    for i in range(odds.band_start, odds.band_end):
+        param = odds.params[i]
+        label = traduire_pari(odds.groups[i], odds.types[i], param, team1, team2)
+        predictions.append({"resultat": label, "param": param if param not in [None, -1.0] else "", "cote": odds.prices[i]})
     return predictions
 
-# Adapter l'affichage de la prédiction du bot (get_alternative_prediction) pour n'afficher le paramètre que s'il existe et est pertinent
-
-def get_alternative_prediction(match: dict, team1: str, team2: str) -> str:
-    meilleures = []
-    for ae in match.get("AE", []):
-        groupe = ae.get("G")
-        for o in ae.get("ME", []):
-            cote = o.get("C")
-            if cote is not None and 1.399 <= cote <= 3:
-                t = o.get("T")
-                param = o.get("P") if "P" in o else None
-                label = traduire_pari(groupe, t, param, team1, team2)
-                meilleures.append((cote, label, param, groupe, t))
-    if meilleures:
-        meilleures.sort(key=lambda x: x[0])
-        cote, label, param, groupe, t = meilleures[0]
-        # N'afficher le paramètre que s'il n'est pas déjà dans le libellé
-        if param not in [None, -1.0, ""]:
-            param_str = str(param)
-            # Si le paramètre est déjà dans le label, ne pas le rajouter
-            if param_str in label:
-                return f"{label} [{cote}]"
-        return f"{label} [{cote}]"
+def get_alternative_prediction(match: dict, team1: str, team2: str, odds: Optional[MatchOdds] = None) -> str:
+    # Meilleure (plus petite) cote alternative de la plage
+    if odds is None:
+        odds = extract_odds(match)
+    for i in range(odds.band_start, odds.band_end):
+        if odds.alternative[i]:
+            label = traduire_pari(odds.groups[i], odds.types[i], odds.params[i], team1, team2)
+            return f"{label} [{odds.prices[i]}]"
     return "Aucune cote alternative dans la plage (1.399 à 3)"
 
 def parse_meteo(match: dict) -> Tuple[str, str]:
@@ -234,7 +654,9 @@ def parse_meteo(match: dict) -> Tuple[str, str]:
     humid = next((item["V"] for item in meteo_data if item.get("K") == 27), "–")
     return temp, humid
 
-def parse_match(match: dict) -> MatchData:
+def parse_match(match: dict, odds: Optional[MatchOdds] = None) -> MatchData:
+    if odds is None:
+        odds = extract_odds(match)
     league = match.get("LE", "–")
     team1 = match.get("O1", "–")
     team2 = match.get("O2", "–")
@@ -244,9 +666,9 @@ def parse_match(match: dict) -> MatchData:
     minute = parse_minute(match)
     status_info = parse_status(match, minute, score1, score2)
     match_ts = match.get("S", 0)
-    match_time = datetime.datetime.utcfromtimestamp(match_ts).strftime('%d/%m/%Y %H:%M') if match_ts else "–"
-    odds = parse_odds(match)
-    prediction = get_prediction(match, team1, team2)
+    # Valide la date dès l'analyse, comme avant ; le texte est ensuite produit au rendu (mis en cache)
+    format_match_time(match_ts)
+    prediction = get_prediction(match, team1, team2, odds)
     temp, humid = parse_meteo(match)
     return MatchData(
         team1=team1,
@@ -256,70 +678,1944 @@ def parse_match(match: dict) -> MatchData:
         league=league,
         sport=sport,
         status=status_info["statut"],
-        datetime=match_time,
+        start=match_ts,
         temp=temp,
         humid=humid,
-        odds=odds,
+        odds=odds.main,
         prediction=prediction,
         id=match.get("I", None)
     )
 
-@app.route('/')
-def home():
+EXPLICATION_PREDICTIONS = "Toutes les opportunités de pari virtuel (alternatives uniquement) comprises entre 1.399 et 3 sont listées ci-dessous, avec leur libellé explicite. Les résultats sont issus de simulations virtuelles (FIFA, NBA2K, etc.)."
+
+def parse_stats(match: dict) -> List[Dict[str, Any]]:
+    stats = []
+    st = match.get("SC", {}).get("ST", [])
+    if st and isinstance(st, list) and len(st) > 0 and "Value" in st[0]:
+        for stat in st[0]["Value"]:
+            nom = stat.get("N", "?")
+            s1 = stat.get("S1", "0")
+            s2 = stat.get("S2", "0")
+            stats.append({"nom": nom, "s1": s1, "s2": s2})
+    return stats
+
+def parse_match_details(match: dict, odds: Optional[MatchOdds] = None) -> Dict[str, Any]:
+    if odds is None:
+        odds = extract_odds(match)
+    team1 = match.get("O1", "–")
+    team2 = match.get("O2", "–")
+    league = match.get("LE", "–")
+    sport = detect_sport(league)
+    return {
+        "team1": team1,
+        "team2": team2,
+        "league": league,
+        "league_name": match.get("CN", "–"),
+        "league_country": match.get("CE", "–"),
+        "sport": sport,
+        "sport_name": match.get("SN", match.get("SE", sport)),
+        "score1": parse_score(match.get("SC", {}).get("FS", {}).get("S1")),
+        "score2": parse_score(match.get("SC", {}).get("FS", {}).get("S2")),
+        "stats": parse_stats(match),
+        "explication": EXPLICATION_PREDICTIONS,
+        "all_predictions": get_all_predictions(match, team1, team2, odds),
+        "alt_prediction": get_alternative_prediction(match, team1, team2, odds),
+    }
+
+# --- Snapshot partagé du flux ---
+@dataclass(frozen=True)
+class ParsedMatch:
+    record: MatchData
+    status: str
+    details: Optional[Dict[str, Any]]
+    odds: MatchOdds
+    odds_matrix: np.ndarray
+    # Empreintes du match brut (complet puis champ par champ) pour le calcul des deltas
+    digest: bytes
+    fields: Mapping[str, bytes]
+
+@dataclass(frozen=True)
+class ChangeSet:
+    added: Tuple[int, ...] = ()
+    removed: Tuple[int, ...] = ()
+    # identifiant -> champs bruts modifiés (ex. "SC", "E", "AE")
+    updated: Mapping[int, Tuple[str, ...]] = field(default_factory=lambda: MappingProxyType({}))
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.updated)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"added": list(self.added), "removed": list(self.removed),
+                "updated": {str(match_id): list(fields) for match_id, fields in self.updated.items()}}
+
+@dataclass(frozen=True)
+class FeedSnapshot:
+    version: int
+    # Empreinte du contenu, identique d'un processus à l'autre pour un même flux (ETag)
+    digest: str
+    fetched_at: float
+    records: Tuple[MatchData, ...]
+    # Index identifiant -> fiche détaillée (prédictions comprises), construit une fois par rafraîchissement
+    details: Mapping[int, Dict[str, Any]]
+    # Index inversés (valeur -> positions dans records) et facettes triées pour les filtres
+    by_sport: Mapping[str, FrozenSet[int]]
+    by_league: Mapping[str, FrozenSet[int]]
+    by_status: Mapping[str, FrozenSet[int]]
+    sports: Tuple[str, ...]
+    leagues: Tuple[str, ...]
+    # Résultats d'analyse réutilisables au rafraîchissement suivant, et delta avec le snapshot précédent
+    parsed: Mapping[int, ParsedMatch]
+    changes: ChangeSet
+
+    def query(self, sport: str = "", league: str = "", status: str = "") -> List[int]:
+        """Positions (ordre du flux) des matchs correspondant aux filtres ; un filtre vide est ignoré."""
+        selected = []
+        if sport:
+            selected.append(self.by_sport.get(sport, frozenset()))
+        if league:
+            selected.append(self.by_league.get(league, frozenset()))
+        if status in STATUS_FILTERS:
+            selected.append(self.by_status.get(status, frozenset()))
+        if not selected:
+            return list(range(len(self.records)))
+        selected.sort(key=len)
+        return sorted(selected[0].intersection(*selected[1:]))
+
+STATUS_FILTERS = ("live", "finished", "upcoming")
+
+def status_filter_key(status_info: Dict[str, Any]) -> str:
+    if status_info["is_live"]:
+        return "live"
+    if status_info["is_finished"]:
+        return "finished"
+    return "upcoming"
+
+def _freeze_index(index: Dict[str, List[int]]) -> Mapping[str, FrozenSet[int]]:
+    return MappingProxyType({key: frozenset(positions) for key, positions in index.items()})
+
+def _digest(value: Any) -> bytes:
+    return hashlib.blake2b(json.dumps(value, separators=(",", ":")).encode(), digest_size=8).digest()
+
+def parse_entry(match: dict, digest: bytes) -> ParsedMatch:
+    with STAGE_SECONDS.time("odds"):
+        odds = extract_odds(match)
+    with STAGE_SECONDS.time("parse_match"):
+        m = parse_match(match, odds)
+    status_info = parse_status(match, parse_minute(match), m.score1, m.score2)
+    details = None
+    if m.id is not None:
+        try:
+            with STAGE_SECONDS.time("predictions"):
+                details = parse_match_details(match, odds)
+        except Exception as e:
+            PARSE_ERRORS.inc("details", type(e).__name__)
+            print(f"Erreur lors du calcul des détails du match {m.id}: {e}")
+    return ParsedMatch(
+        record=m,
+        status=status_filter_key(status_info),
+        details=details,
+        odds=odds,
+        odds_matrix=odds_matrix(odds),
+        digest=digest,
+        fields=MappingProxyType({key: _digest(value) for key, value in match.items()}),
+    )
+
+def _parse_chunk(chunk: List[Tuple[dict, bytes]]) -> bytes:
+    # Exécuté dans un processus du pool : une erreur est renvoyée (type, message) plutôt que levée,
+    # pour ne pas perdre le reste du lot ; les métriques d'étapes du processus fils ne sont pas remontées.
+    # Le lot revient déjà sérialisé : le parent le désérialise lui-même, ramasse-miettes suspendu
+    results: List[Any] = []
+    for match, digest in chunk:
+        try:
+            results.append(parse_entry(match, digest))
+        except Exception as e:
+            results.append((type(e).__name__, str(e)))
+    return pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL)
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # Des milliers de petits objets créés d'un coup (désérialisation) déclenchent sinon plusieurs collectes inutiles
+    enabled = gc.isenabled()
+    gc.disable()
     try:
-        selected_sport = request.args.get("sport", "").strip()
-        selected_league = request.args.get("league", "").strip()
-        selected_status = request.args.get("status", "").strip()
+        yield
+    finally:
+        if enabled:
+            gc.enable()
 
-        api_url = "https://1xbet.com/LiveFeed/Get1x2_VZip?sports=85&count=50&lng=fr&gr=70&mode=4&country=96&getEmpty=true"
-        response = requests.get(api_url)
-        matches = response.json().get("Value", [])
+def _load_chunks(blobs: Iterable[bytes]) -> List[Any]:
+    with _gc_paused():
+        return [entry for blob in blobs for entry in pickle.loads(blob)]
 
-        sports_detected = set()
-        leagues_detected = set()
-        data: List[MatchData] = []
+def _parse_or_report(match: dict, digest: bytes) -> Optional[ParsedMatch]:
+    try:
+        return parse_entry(match, digest)
+    except Exception as e:
+        PARSE_ERRORS.inc("match", type(e).__name__)
+        print(f"Erreur lors du traitement d'un match: {e}")
+        return None
 
-        for match in matches:
+class ParsePool:
+    """Analyse des matchs nouveaux ou modifiés répartie par lots sur un pool de processus.
+
+    Les ParsedMatch reviennent sérialisés (MatchData et index en lecture seule ont un pickle compact).
+    En dessous de `min_matches`, ou si le pool est indisponible, l'analyse se fait en série.
+    Les processus fils sont lancés par un serveur forkserver : ils ne copient pas les verrous
+    des threads du processus parent (poller, métriques) et n'héritent pas des libellés de paris
+    enregistrés après l'import.
+    """
+
+    def __init__(self, workers: int, min_matches: int, chunk_size: int):
+        self.workers = workers
+        self.min_matches = min_matches
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 1
+
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None or self._pid != os.getpid():
+            context = multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            self._pid = os.getpid()
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown()
+        self._executor = None
+
+    def parse(self, pending: List[Tuple[dict, bytes]]) -> List[Optional[ParsedMatch]]:
+        if not self.enabled or len(pending) < self.min_matches:
+            return [_parse_or_report(match, digest) for match, digest in pending]
+        # Au moins deux lots par processus pour équilibrer la charge
+        size = max(1, min(self.chunk_size, math.ceil(len(pending) / (self.workers * 2))))
+        chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+        try:
+            with STAGE_SECONDS.time("parse_parallel"):
+                blobs = list(self.executor().map(_parse_chunk, chunks))
+            results = _load_chunks(blobs)
+        except Exception as e:
+            print(f"Analyse parallèle indisponible, analyse en série: {e}")
+            self.shutdown()
+            return [_parse_or_report(match, digest) for match, digest in pending]
+        entries: List[Optional[ParsedMatch]] = []
+        for result in results:
+            if isinstance(result, ParsedMatch):
+                entries.append(result)
+            else:
+                error_type, message = result
+                PARSE_ERRORS.inc("match", error_type)
+                print(f"Erreur lors du traitement d'un match: {message}")
+                entries.append(None)
+        return entries
+
+parse_pool = ParsePool(FEED_PARSE_WORKERS, FEED_PARSE_MIN_MATCHES, FEED_PARSE_CHUNK)
+
+def _changed_fields(old: Mapping[str, bytes], new: Mapping[str, bytes]) -> Tuple[str, ...]:
+    return tuple(sorted(key for key in old.keys() | new.keys() if old.get(key) != new.get(key)))
+
+_snapshot_versions = itertools.count(1)
+
+def advance_snapshot_versions(version: int) -> None:
+    # Un snapshot reçu d'un autre processus : les versions construites ici doivent rester croissantes
+    global _snapshot_versions
+    _snapshot_versions = itertools.count(version + 1)
+
+def build_snapshot(matches: Iterable[dict], previous: Optional[FeedSnapshot] = None, reparse: bool = False) -> FeedSnapshot:
+    """Construit le snapshot en ne ré-analysant que les matchs ajoutés ou modifiés depuis `previous`.
+
+    Avec `reparse`, tous les matchs sont ré-analysés ; `previous` ne sert alors qu'au calcul des changements.
+    """
+    previous_parsed = previous.parsed if previous is not None else {}
+    # Avec un pool de processus, les matchs à analyser sont d'abord collectés puis analysés d'un bloc ;
+    # sinon chacun est analysé à la volée (en mode continu, pendant la suite du téléchargement)
+    deferred = parse_pool.enabled
+    plan: List[Tuple[Any, Optional[ParsedMatch], Optional[ParsedMatch], bool]] = []
+    pending: List[Tuple[dict, bytes]] = []
+    seen = set()
+    for match in matches:
+        match_id = match.get("I")
+        digest = _digest(match)
+        old = previous_parsed.get(match_id)
+        if not reparse and old is not None and old.digest == digest and match_id not in seen:
+            plan.append((match_id, old, old, True))
+        elif deferred:
+            pending.append((match, digest))
+            plan.append((match_id, old, None, False))
+        else:
+            plan.append((match_id, old, _parse_or_report(match, digest), False))
+        seen.add(match_id)
+    if pending:
+        results = iter(parse_pool.parse(pending))
+        plan = [(match_id, old, entry if reuse else next(results), reuse)
+                for match_id, old, entry, reuse in plan]
+
+    entries: List[ParsedMatch] = []
+    parsed: Dict[int, ParsedMatch] = {}
+    added: List[int] = []
+    updated: Dict[int, Tuple[str, ...]] = {}
+    reused = 0
+    for match_id, old, entry, reuse in plan:
+        if entry is None:
+            continue
+        if reuse:
+            reused += 1
+        else:
+            if match_id is not None and match_id not in parsed:
+                if old is not None:
+                    fields = _changed_fields(old.fields, entry.fields)
+                    # Ré-analyse d'un match identique : il n'a changé que si l'analyse donne un autre résultat
+                    if fields or old.digest != entry.digest:
+                        updated[match_id] = fields
+                else:
+                    added.append(match_id)
+        entries.append(entry)
+        # En cas de doublon, la première occurrence l'emporte (comme l'ancien next(...))
+        if match_id is not None and match_id not in parsed:
+            parsed[match_id] = entry
+    removed = tuple(match_id for match_id in previous_parsed if match_id not in parsed)
+    changes = ChangeSet(tuple(added), removed, MappingProxyType(updated))
+    MATCHES_PARSED.inc(amount=len(entries) - reused)
+    MATCHES_REUSED.inc(amount=reused)
+    REFRESH_MATCHES.set(len(entries) - reused, "parsed")
+    REFRESH_MATCHES.set(reused, "reused")
+
+    records = tuple(entry.record for entry in entries)
+    if previous is not None and not reparse and not changes and records == previous.records:
+        # Rien n'a changé : on garde les index et la version du snapshot précédent
+        return replace(previous, fetched_at=time.time(), changes=changes)
+
+    details: Dict[int, Dict[str, Any]] = {}
+    by_sport: Dict[str, List[int]] = {}
+    by_league: Dict[str, List[int]] = {}
+    by_status: Dict[str, List[int]] = {}
+    for position, entry in enumerate(entries):
+        m = entry.record
+        by_sport.setdefault(m.sport, []).append(position)
+        by_league.setdefault(m.league, []).append(position)
+        by_status.setdefault(entry.status, []).append(position)
+    for match_id, entry in parsed.items():
+        if entry.details is not None:
+            details[match_id] = entry.details
+    return FeedSnapshot(
+        version=next(_snapshot_versions),
+        digest=hashlib.blake2b(b"".join(entry.digest for entry in entries), digest_size=8).hexdigest(),
+        fetched_at=time.time(),
+        records=records,
+        details=MappingProxyType(details),
+        by_sport=_freeze_index(by_sport),
+        by_league=_freeze_index(by_league),
+        by_status=_freeze_index(by_status),
+        sports=tuple(sorted(by_sport)),
+        leagues=tuple(sorted(by_league)),
+        parsed=MappingProxyType(parsed),
+        changes=changes,
+    )
+
+# --- Décodage JSON incrémental ---
+_WHITESPACE = " \t\n\r"
+_NUMBER_TAIL = "0123456789.eE+-"
+
+def iter_json_array(chunks: Iterable[bytes], key: str = "Value") -> Iterator[Any]:
+    """Décode `{"...": ..., key: [e1, e2, ...], ...}` morceau par morceau et produit e1, e2... dès qu'ils sont complets.
+
+    Seul l'élément en cours (plus un morceau) est gardé en mémoire ; les autres clés de l'objet sont
+    décodées puis ignorées, et la lecture s'arrête à la fin du tableau.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buf = ""
+    pos = 0
+    eof = False
+
+    def more() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            tail = utf8.decode(b"", final=True)
+        else:
+            tail = utf8.decode(chunk)
+        # Compactage amorti : on ne recopie le tampon que lorsque la partie consommée est grande
+        if pos > FEED_STREAM_CHUNK:
+            buf = buf[pos:]
+            pos = 0
+        buf += tail
+        return True
+
+    def skip_whitespace() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not more():
+                return ""
+
+    def expect(chars: str) -> str:
+        nonlocal pos
+        char = skip_whitespace()
+        if not char or char not in chars:
+            raise ValueError(f"JSON invalide : {chars!r} attendu à la position {pos}, trouvé {char!r}")
+        pos += 1
+        return char
+
+    def decode_value() -> Any:
+        nonlocal pos
+        skip_whitespace()
+        while True:
             try:
-                m = parse_match(match)
-                sports_detected.add(m.sport)
-                leagues_detected.add(m.league)
-                # Filtres
-                if selected_sport and m.sport != selected_sport:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if more():
                     continue
-                if selected_league and m.league != selected_league:
+                raise
+            # Un nombre coupé entre deux morceaux (« 1. » puis « 5e10 ») se décode aussi : on attend la suite
+            if (end == len(buf) or buf[end] in _NUMBER_TAIL) and more():
+                continue
+            pos = end
+            return value
+
+    expect("{")
+    if skip_whitespace() == "}":
+        return
+    while True:
+        name = decode_value()
+        expect(":")
+        if name == key and skip_whitespace() == "[":
+            pos += 1
+            if skip_whitespace() == "]":
+                return
+            while True:
+                yield decode_value()
+                if expect(",]") == "]":
+                    return
+        value = decode_value()
+        if name == key and isinstance(value, list):
+            yield from value
+            return
+        if expect(",}") == "}":
+            return
+
+# --- Client HTTP du flux ---
+class CircuitOpenError(RuntimeError):
+    pass
+
+class CircuitBreaker:
+    """Coupe les appels amont après `threshold` échecs consécutifs, puis laisse passer un essai après `cooldown` secondes."""
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> None:
+        if self.state == "open":
+            raise CircuitOpenError(f"flux amont indisponible ({self.failures} échecs consécutifs), nouvel essai dans moins de {self.cooldown:.0f} s")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                # En half-open, un nouvel échec relance la période de refroidissement
+                self.opened_at = time.monotonic()
+
+def _counted(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        yield chunk
+    PAYLOAD_BYTES.observe(size)
+
+class FeedClient:
+    """Session HTTP partagée (keep-alive, pool de connexions) pour tous les appels au flux."""
+
+    def __init__(self, connect_timeout: float, read_timeout: float, max_retries: int, backoff: float,
+                 pool_size: int, breaker: CircuitBreaker):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.breaker = breaker
+        self._session: Optional[requests.Session] = None
+        self._pid: Optional[int] = None
+
+    def session(self) -> requests.Session:
+        # Les sockets du pool ne doivent pas être partagés entre processus après un fork
+        if self._session is None or self._pid != os.getpid():
+            retry = Retry(
+                total=self.max_retries,
+                backoff_factor=self.backoff,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET",),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session = session
+            self._pid = os.getpid()
+        return self._session
+
+    def iter_json_array(self, url: str, key: str = "Value", breaker: Optional[CircuitBreaker] = None) -> Iterator[Any]:
+        """Éléments du tableau `key` de la réponse, décodés au fil de l'eau (voir iter_json_array)."""
+        breaker = breaker or self.breaker
+        breaker.before_call()
+        try:
+            with self.session().get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                yield from iter_json_array(_counted(response.iter_content(chunk_size=FEED_STREAM_CHUNK)), key)
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+
+    def get_json(self, url: str, breaker: Optional[CircuitBreaker] = None) -> Any:
+        # Chaque source a son propre disjoncteur : une source en panne ne coupe pas les autres
+        breaker = breaker or self.breaker
+        breaker.before_call()
+        try:
+            with STAGE_SECONDS.time("fetch"):
+                response = self.session().get(url, timeout=self.timeout)
+                response.raise_for_status()
+            PAYLOAD_BYTES.observe(len(response.content))
+            with STAGE_SECONDS.time("decode"):
+                data = response.json()
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        return data
+
+feed_client = FeedClient(
+    FEED_CONNECT_TIMEOUT,
+    FEED_READ_TIMEOUT,
+    FEED_MAX_RETRIES,
+    FEED_RETRY_BACKOFF,
+    FEED_POOL_SIZE,
+    CircuitBreaker(FEED_BREAKER_THRESHOLD, FEED_BREAKER_COOLDOWN),
+)
+
+# --- Récupérations partagées (single-flight) ---
+class FlightError(RuntimeError):
+    pass
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.waiters = 0
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """Un seul appel en cours par clé : les appelants concurrents attendent son résultat (ou son exception)
+    au lieu de relancer le même appel. Au-delà de `max_waiters` en attente, ou après `timeout` secondes,
+    l'appelant reçoit une FlightError."""
+
+    def __init__(self, name: str, max_waiters: int, timeout: float):
+        self.name = name
+        self.max_waiters = max_waiters
+        self.timeout = timeout
+        self._flights: Dict[Any, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Any, func, *args) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            elif flight.waiters >= self.max_waiters:
+                FLIGHT_CALLS.inc(self.name, "rejected")
+                raise FlightError(f"trop de requêtes en attente de {self.name} ({flight.waiters})")
+            else:
+                flight.waiters += 1
+        if leader:
+            FLIGHT_CALLS.inc(self.name, "leader")
+            try:
+                flight.result = func(*args)
+            except BaseException as e:
+                flight.error = e
+            finally:
+                # Retiré avant le réveil : un appel arrivant ensuite relance une récupération fraîche
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+        else:
+            if not flight.done.wait(self.timeout):
+                FLIGHT_CALLS.inc(self.name, "timeout")
+                raise FlightError(f"{self.name} toujours en cours après {self.timeout:.0f} s")
+            FLIGHT_CALLS.inc(self.name, "shared")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+fetch_flights = SingleFlight("fetch", FEED_FLIGHT_MAX_WAITERS, FEED_FLIGHT_TIMEOUT)
+
+def fetch_feed(url: str, breaker: Optional[CircuitBreaker] = None) -> List[dict]:
+    # Les appels concurrents à une même URL partagent une seule requête amont (liste à ne pas modifier)
+    return fetch_flights.do(url, lambda: feed_client.get_json(url, breaker).get("Value", []))
+
+def stream_feed(url: str, breaker: Optional[CircuitBreaker] = None) -> Iterator[dict]:
+    return feed_client.iter_json_array(url, "Value", breaker)
+
+# --- Sources multiples ---
+@dataclass(frozen=True)
+class FeedSource:
+    name: str
+    url: str
+    breaker: CircuitBreaker = field(compare=False, repr=False)
+
+def parse_feed_sources(base_url: str, spec: str) -> Tuple[FeedSource, ...]:
+    """FEED_URL suivi des sources de FEED_SOURCES, sans doublon d'URL."""
+    scheme, netloc, path, query, fragment = urlsplit(base_url)
+    base_params = dict(parse_qsl(query, keep_blank_values=True))
+    urls = [base_url]
+    names = ["défaut"]
+    for entry in filter(None, (part.strip() for part in spec.split(";"))):
+        if "://" in entry:
+            url = entry
+        else:
+            params = dict(base_params)
+            params.update(parse_qsl(entry, keep_blank_values=True))
+            url = urlunsplit((scheme, netloc, path, urlencode(params), fragment))
+        if url not in urls:
+            urls.append(url)
+            names.append(entry)
+    return tuple(
+        FeedSource(name, url, CircuitBreaker(FEED_BREAKER_THRESHOLD, FEED_BREAKER_COOLDOWN))
+        for name, url in zip(names, urls)
+    )
+
+def merge_feeds(results: Iterable[List[dict]]) -> List[dict]:
+    """Concatène les flux dans l'ordre des sources ; un match déjà fourni par une source précédente est ignoré."""
+    merged: List[dict] = []
+    seen = set()
+    for matches in results:
+        ids = set()
+        for match in matches:
+            match_id = match.get("I")
+            if match_id in seen:
+                continue
+            ids.add(match_id)
+            merged.append(match)
+        seen |= ids
+    return merged
+
+# --- Diffusion des deltas (SSE) ---
+@dataclass(frozen=True)
+class DeltaItem:
+    match_id: int
+    # (sport, ligue, statut) avant et après ; None si le match est ajouté ou retiré
+    old_key: Optional[Tuple[str, str, str]]
+    new_key: Optional[Tuple[str, str, str]]
+    row_json: Optional[str]
+    details_json: Optional[str]
+
+def _entry_key(entry: ParsedMatch) -> Tuple[str, str, str]:
+    return entry.record.sport, entry.record.league, entry.status
+
+def snapshot_delta(previous: FeedSnapshot, current: FeedSnapshot) -> Tuple[DeltaItem, ...]:
+    """Sérialise une seule fois les matchs modifiés ; chaque abonné ne fait ensuite que filtrer."""
+    items = []
+    changes = current.changes
+    for match_id in itertools.chain(changes.added, changes.updated):
+        old = previous.parsed.get(match_id)
+        entry = current.parsed[match_id]
+        items.append(DeltaItem(
+            match_id=match_id,
+            old_key=_entry_key(old) if old is not None else None,
+            new_key=_entry_key(entry),
+            row_json=entry.record.to_json(),
+            details_json=json.dumps(entry.details) if entry.details is not None else None,
+        ))
+    for match_id in changes.removed:
+        old = previous.parsed.get(match_id)
+        items.append(DeltaItem(match_id, _entry_key(old) if old is not None else None, None, None, None))
+    return tuple(items)
+
+class SnapshotBroadcaster:
+    """Réveille les flux SSE à chaque nouvelle version du snapshot."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._previous: Optional[FeedSnapshot] = None
+        self._current: Optional[FeedSnapshot] = None
+        self._delta: Optional[Tuple[DeltaItem, ...]] = None
+
+    def publish(self, snapshot: FeedSnapshot) -> None:
+        with self._condition:
+            if self._current is not None and self._current.version == snapshot.version:
+                return
+            self._previous, self._current, self._delta = self._current, snapshot, None
+            self._condition.notify_all()
+
+    def wait(self, version: int, timeout: float) -> Optional[FeedSnapshot]:
+        with self._condition:
+            self._condition.wait_for(lambda: self._current is not None and self._current.version != version, timeout)
+            return self._current
+
+    def delta(self) -> Tuple[Optional[int], int, Tuple[DeltaItem, ...]]:
+        """(version précédente, version courante, éléments du delta) pour la dernière publication."""
+        with self._condition:
+            previous, current = self._previous, self._current
+            if previous is None:
+                return None, current.version, ()
+            if self._delta is None:
+                self._delta = snapshot_delta(previous, current)
+            return previous.version, current.version, self._delta
+
+broadcaster = SnapshotBroadcaster()
+
+# --- Historique des cotes (segments binaires projetés en mémoire) ---
+# Enregistrement de taille fixe : horodatage, identifiant du match, G, T, P, cote
+HISTORY_RECORD = struct.Struct("<dqiidd")
+# En-tête de segment : signature, nombre d'enregistrements écrits (mis à jour après chaque lot)
+HISTORY_HEADER = struct.Struct("<8sQ")
+HISTORY_MAGIC = b"ODDSHIS1"
+
+class OddsHistoryStore:
+    """Journal en ajout seul des changements de cote par (match, G, T, P).
+
+    Les enregistrements sont écrits dans des segments de taille fixe projetés en mémoire (mmap) ;
+    un index en mémoire garde, par match, les numéros et horodatages de ses enregistrements, si bien
+    qu'une lecture ne touche que les pages concernées. Un seul processus écrit (verrou fichier) ; les
+    autres workers relisent les nouveaux enregistrements à la demande.
+    """
+
+    def __init__(self, directory: str, segment_records: int, max_segments: int):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.max_segments = max_segments
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+
+    def _reset(self) -> None:
+        self._segments: Dict[int, mmap.mmap] = {}
+        self._numbers: Dict[int, array] = {}
+        self._times: Dict[int, array] = {}
+        # Dernière cote connue par match puis par (G, T, P)
+        self._last: Dict[int, Dict[Tuple[int, int, float], float]] = {}
+        self._first = 0
+        self._position = 0
+
+    def _open(self) -> None:
+        # Un état par processus : le verrou d'écriture et les mmaps ne sont pas hérités d'un fork
+        if self._pid == os.getpid():
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._reset()
+        self._lock_fd = os.open(os.path.join(self.directory, "writer.lock"), os.O_RDWR | os.O_CREAT)
+        self.writer = False
+        self._try_write()
+        existing = self._segment_numbers()
+        if existing:
+            self._first = self._position = existing[0] * self.segment_records
+        self._pid = os.getpid()
+        self._catch_up()
+
+    def _try_write(self) -> bool:
+        """Vrai si ce processus devient l'écrivain ; retenté à chaque enregistrement tant qu'il ne l'est pas."""
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        # Segments projetés en lecture seule : rouverts en écriture à la demande
+        for mm in self._segments.values():
+            mm.close()
+        self._segments.clear()
+        self.writer = True
+        return True
+
+    def _segment_numbers(self) -> List[int]:
+        return sorted(int(name[8:14]) for name in os.listdir(self.directory)
+                      if name.startswith("segment-") and name.endswith(".odds"))
+
+    def _path(self, number: int) -> str:
+        return os.path.join(self.directory, f"segment-{number:06d}.odds")
+
+    def _segment(self, number: int, create: bool = False) -> Optional[mmap.mmap]:
+        mm = self._segments.get(number)
+        if mm is not None:
+            return mm
+        path = self._path(number)
+        size = HISTORY_HEADER.size + self.segment_records * HISTORY_RECORD.size
+        if not os.path.exists(path):
+            if not create:
+                return None
+            # Fichier pré-dimensionné (creux) puis renommé : un lecteur ne voit jamais de segment partiel
+            tmp = f"{path}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(HISTORY_HEADER.pack(HISTORY_MAGIC, 0))
+                f.truncate(size)
+            os.replace(tmp, path)
+        with open(path, "r+b" if self.writer else "rb") as f:
+            mm = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_WRITE if self.writer else mmap.ACCESS_READ)
+        magic, _ = HISTORY_HEADER.unpack_from(mm, 0)
+        if magic != HISTORY_MAGIC:
+            mm.close()
+            raise ValueError(f"Segment d'historique invalide : {path}")
+        self._segments[number] = mm
+        return mm
+
+    def _index(self, number: int, ts: float, match_id: int, groupe: int, t: int, param: float, cote: float) -> None:
+        numbers = self._numbers.get(match_id)
+        if numbers is None:
+            numbers = self._numbers[match_id] = array("Q")
+            self._times[match_id] = array("d")
+        numbers.append(number)
+        self._times[match_id].append(ts)
+        self._last.setdefault(match_id, {})[(groupe, t, param)] = cote
+
+    def _catch_up(self) -> None:
+        # Indexe les enregistrements écrits depuis la dernière lecture (par ce processus ou par l'écrivain)
+        while True:
+            segment, start = divmod(self._position, self.segment_records)
+            mm = self._segment(segment)
+            if mm is None:
+                # Segment supprimé par la rétention pendant que ce processus était en retard : on saute au suivant
+                later = [number for number in self._segment_numbers() if number > segment]
+                if not later:
+                    return
+                self._position = self._first = later[0] * self.segment_records
+                continue
+            _, count = HISTORY_HEADER.unpack_from(mm, 0)
+            if count > start:
+                base = segment * self.segment_records
+                with memoryview(mm) as view:
+                    records = view[HISTORY_HEADER.size + start * HISTORY_RECORD.size:HISTORY_HEADER.size + count * HISTORY_RECORD.size]
+                    for offset, record in enumerate(HISTORY_RECORD.iter_unpack(records), start):
+                        self._index(base + offset, *record)
+                    records.release()
+                self._position = base + count
+            if count < self.segment_records:
+                return
+
+    def _drop_old_segments(self, current: int) -> None:
+        oldest = current - self.max_segments + 1
+        for number in self._segment_numbers():
+            if number >= oldest:
+                break
+            mm = self._segments.pop(number, None)
+            if mm is not None:
+                mm.close()
+            os.remove(self._path(number))
+        first = max(self._first, oldest * self.segment_records)
+        if first == self._first:
+            return
+        self._first = first
+        for match_id in list(self._numbers):
+            numbers = self._numbers[match_id]
+            keep = bisect_left(numbers, first)
+            if keep == len(numbers):
+                del self._numbers[match_id], self._times[match_id]
+            elif keep:
+                self._numbers[match_id] = numbers[keep:]
+                self._times[match_id] = self._times[match_id][keep:]
+
+    def record(self, snapshot: FeedSnapshot) -> int:
+        """Ajoute les cotes qui ont changé depuis le dernier enregistrement ; renvoie le nombre d'enregistrements écrits."""
+        with self._lock:
+            self._open()
+            takeover = False
+            if not self.writer:
+                # L'écrivain précédent a pu s'arrêter : on reprend le verrou, puis ses derniers enregistrements
+                if not self._try_write():
+                    return 0
+                self._catch_up()
+                takeover = True
+            changes = snapshot.changes
+            if takeover:
+                # Les cotes changées sans écrivain sont comparées à la dernière valeur enregistrée de chaque match
+                match_ids = list(snapshot.parsed)
+            else:
+                match_ids = list(changes.added) + [match_id for match_id, fields in changes.updated.items()
+                                                   if "E" in fields or "AE" in fields]
+            written = 0
+            touched: Dict[int, int] = {}
+            for match_id in changes.removed:
+                self._last.pop(match_id, None)
+            for match_id in match_ids:
+                entry = snapshot.parsed.get(match_id)
+                if entry is None:
                     continue
-                status_info = parse_status(match, parse_minute(match), m.score1, m.score2)
-                if selected_status == "live" and not status_info["is_live"]:
+                last = self._last.get(match_id, {})
+                seen = set()
+                for groupe, t, param, cote in np.nan_to_num(entry.odds_matrix, nan=-1.0).tolist():
+                    key = (int(groupe), int(t), param)
+                    # Même (G, T, P) présent plusieurs fois (E et AE) : seule la première cote (la plus basse) compte
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    if last.get(key) == cote:
+                        continue
+                    try:
+                        record = HISTORY_RECORD.pack(snapshot.fetched_at, match_id, key[0], key[1], param, cote)
+                    except struct.error:
+                        # G ou T hors de l'int32 : seul cet enregistrement est ignoré, pas le reste du lot
+                        HISTORY_ERRORS.inc("out_of_range")
+                        continue
+                    segment, slot = divmod(self._position, self.segment_records)
+                    mm = self._segment(segment, create=True)
+                    if slot == 0:
+                        self._drop_old_segments(segment)
+                    start = HISTORY_HEADER.size + slot * HISTORY_RECORD.size
+                    mm[start:start + HISTORY_RECORD.size] = record
+                    self._index(self._position, snapshot.fetched_at, match_id, *key, cote)
+                    self._position += 1
+                    touched[segment] = slot + 1
+                    written += 1
+            for segment, count in touched.items():
+                HISTORY_HEADER.pack_into(self._segments[segment], 0, HISTORY_MAGIC, count)
+            return written
+
+    def history(self, match_id: int, since: Optional[float] = None, until: Optional[float] = None) -> List[Tuple[float, int, int, float, float]]:
+        """Enregistrements (horodatage, G, T, P, cote) d'un match, dans l'ordre chronologique."""
+        with self._lock:
+            self._open()
+            if not self.writer:
+                self._catch_up()
+            numbers = self._numbers.get(match_id)
+            if numbers is None:
+                return []
+            times = self._times[match_id]
+            lo = bisect_left(times, since) if since is not None else 0
+            hi = bisect_right(times, until) if until is not None else len(times)
+            rows = []
+            for number in numbers[lo:hi]:
+                segment, slot = divmod(number, self.segment_records)
+                mm = self._segment(segment)
+                if mm is None:
                     continue
-                if selected_status == "finished" and not status_info["is_finished"]:
+                ts, _, groupe, t, param, cote = HISTORY_RECORD.unpack_from(mm, HISTORY_HEADER.size + slot * HISTORY_RECORD.size)
+                rows.append((ts, groupe, t, param, cote))
+            return rows
+
+history_store = OddsHistoryStore(ODDS_HISTORY_DIR, ODDS_HISTORY_SEGMENT_RECORDS, ODDS_HISTORY_MAX_SEGMENTS) if ODDS_HISTORY_DIR else None
+
+# --- Snapshot partagé entre workers (fichier projeté en mémoire) ---
+# En-tête : signature, version et date du snapshot, taille du pickle, nombre de tampons hors bande, digest du snapshot
+SHARED_HEADER = struct.Struct("<8sQdQQ8s")
+# Table des tampons hors bande (tableaux NumPy) : position et taille dans le fichier
+SHARED_BUFFER = struct.Struct("<QQ")
+
+# Les index du snapshot sont en lecture seule (MappingProxyType), que pickle ne sait pas sérialiser seul
+def _mapping_proxy(data: dict) -> Mapping:
+    return MappingProxyType(data)
+
+copyreg.pickle(MappingProxyType, lambda proxy: (_mapping_proxy, (dict(proxy),)))
+
+class SharedSnapshotStore:
+    """Snapshot sérialisé dans un fichier unique, remplacé atomiquement à chaque publication.
+
+    Un seul processus (verrou fichier, repris par un autre worker s'il disparaît) récupère et analyse
+    le flux ; les autres projettent le fichier en mémoire et le désérialisent quand il change. Les
+    tableaux de cotes sont des tampons hors bande (pickle 5) lus directement dans la projection.
+    Le même format sert au snapshot conservé sur disque pour le démarrage (`durable` : fsync avant
+    remplacement). La signature (`magic`) dépend de la structure des classes sérialisées : un fichier
+    écrit par une autre version du code est refusé. Un snapshot est identifié par sa version et son
+    digest, les versions repartant de 1 à chaque nouvel écrivain.
+    """
+
+    def __init__(self, directory: str, magic: bytes, durable: bool = False):
+        self.directory = directory
+        self.path = os.path.join(directory, "snapshot.bin")
+        self.magic = magic
+        self.durable = durable
+        self._lock_fd: Optional[int] = None
+        self._lock_pid: Optional[int] = None
+        self._loaded: Optional[Tuple[int, int]] = None
+        self._written: Optional[int] = None
+
+    def try_lead(self) -> bool:
+        """Vrai si ce processus est (ou devient) celui qui récupère le flux."""
+        # Un verrou hérité d'un fork appartient au parent : chaque processus ouvre le sien
+        if self._lock_pid == os.getpid():
+            return True
+        os.makedirs(self.directory, exist_ok=True)
+        fd = os.open(os.path.join(self.directory, "fetcher.lock"), os.O_RDWR | os.O_CREAT)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd, self._lock_pid = fd, os.getpid()
+        return True
+
+    @property
+    def leader(self) -> bool:
+        return self._lock_pid == os.getpid()
+
+    def write(self, snapshot: FeedSnapshot) -> None:
+        if snapshot.version == self._written:
+            # Flux inchangé : seule la date de récupération de l'en-tête est réécrite
+            fd = os.open(self.path, os.O_WRONLY)
+            try:
+                os.pwrite(fd, struct.pack("<d", snapshot.fetched_at), 16)
+            finally:
+                os.close(fd)
+            return
+        buffers: List[pickle.PickleBuffer] = []
+        data = pickle.dumps(snapshot, protocol=5, buffer_callback=buffers.append)
+        raws = [buffer.raw() for buffer in buffers]
+        position = SHARED_HEADER.size + len(raws) * SHARED_BUFFER.size + len(data)
+        table = []
+        for raw in raws:
+            # Alignement sur 8 octets pour les float64
+            position += -position % 8
+            table.append(SHARED_BUFFER.pack(position, raw.nbytes))
+            position += raw.nbytes
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(SHARED_HEADER.pack(self.magic, snapshot.version, snapshot.fetched_at, len(data), len(raws),
+                                       bytes.fromhex(snapshot.digest)))
+            f.writelines(table)
+            f.write(data)
+            for raw in raws:
+                f.write(b"\0" * (-f.tell() % 8))
+                f.write(raw)
+            if self.durable:
+                f.flush()
+                os.fsync(f.fileno())
+        # Les lecteurs voient l'ancien fichier ou le nouveau, jamais un fichier partiel
+        os.replace(tmp, self.path)
+        self._written = snapshot.version
+
+    def load(self, current: Optional[FeedSnapshot], max_age: Optional[float] = None) -> Optional[FeedSnapshot]:
+        """Snapshot publié s'il a changé depuis la dernière lecture (et date de moins de `max_age` secondes), sinon None."""
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return None
+        try:
+            stat = os.fstat(fd)
+            key = (stat.st_ino, stat.st_mtime_ns)
+            if key == self._loaded:
+                return None
+            mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        magic, version, fetched_at, size, count, digest = SHARED_HEADER.unpack_from(mm, 0)
+        # Fichier lu une seule fois, même refusé : il n'est relu qu'une fois remplacé
+        self._loaded = key
+        if magic != self.magic:
+            raise ValueError(f"Snapshot invalide ou d'un format antérieur : {self.path}")
+        if max_age is not None and time.time() - fetched_at > max_age:
+            return None
+        if current is not None and current.version == version and current.digest == digest.hex():
+            # Flux inchangé : seule la date de récupération avance
+            return replace(current, fetched_at=fetched_at)
+        view = memoryview(mm)
+        start = SHARED_HEADER.size + count * SHARED_BUFFER.size
+        buffers = []
+        if start + size > len(mm):
+            raise ValueError(f"Snapshot tronqué : {self.path}")
+        for i in range(count):
+            offset, length = SHARED_BUFFER.unpack_from(mm, SHARED_HEADER.size + i * SHARED_BUFFER.size)
+            if offset + length > len(mm):
+                raise ValueError(f"Snapshot tronqué : {self.path}")
+            buffers.append(view[offset:offset + length])
+        # Les tableaux restent adossés à la projection, qui vit tant qu'ils sont référencés
+        with _gc_paused():
+            snapshot = pickle.loads(view[start:start + size], buffers=buffers)
+        advance_snapshot_versions(snapshot.version)
+        return snapshot
+
+def _schema_magic() -> bytes:
+    # Un snapshot écrit par une version du code dont l'en-tête ou les classes sérialisées diffèrent est refusé
+    layout = repr((
+        SHARED_HEADER.format,
+        [f.name for f in dataclasses.fields(FeedSnapshot)],
+        [f.name for f in dataclasses.fields(ParsedMatch)],
+        [f.name for f in dataclasses.fields(ChangeSet)],
+        MatchOdds._fields,
+        MatchData.__slots__,
+    ))
+    return b"SNAP" + hashlib.blake2b(layout.encode(), digest_size=4).digest()
+
+shared_snapshot = SharedSnapshotStore(SHARED_SNAPSHOT_DIR, _schema_magic()) if SHARED_SNAPSHOT_DIR else None
+persisted_snapshot = SharedSnapshotStore(SNAPSHOT_PERSIST_DIR, _schema_magic(), durable=True) if SNAPSHOT_PERSIST_DIR else None
+
+# --- Planification des matchs en direct ---
+class LiveSchedule:
+    """Échéance de la prochaine mise à jour de chaque match en direct.
+
+    Un match qui change garde l'intervalle court ; un match inchangé voit son intervalle multiplié par
+    `backoff` jusqu'à `max_interval`. Les matchs qui ne sont plus en direct sortent du planning.
+    """
+
+    def __init__(self, interval: float, max_interval: float, backoff: float):
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self._due: Dict[int, float] = {}
+        self._intervals: Dict[int, float] = {}
+
+    def sync(self, snapshot: FeedSnapshot, now: float) -> None:
+        live = {snapshot.records[position].id for position in snapshot.by_status.get("live", ())}
+        live.discard(None)
+        for match_id in list(self._due):
+            if match_id not in live:
+                del self._due[match_id]
+                del self._intervals[match_id]
+        for match_id in live:
+            if match_id not in self._due:
+                self._due[match_id] = now + self.interval
+                self._intervals[match_id] = self.interval
+
+    def due(self, now: float) -> List[int]:
+        return [match_id for match_id, due in self._due.items() if due <= now]
+
+    def record(self, match_id: int, changed: bool, now: float) -> None:
+        if match_id not in self._due:
+            return
+        interval = self.interval if changed else min(self._intervals[match_id] * self.backoff, self.max_interval)
+        self._intervals[match_id] = interval
+        self._due[match_id] = now + interval
+
+    def record_all(self, changed: Iterable[int], now: float) -> None:
+        """Après une récupération du flux complet, qui a mis à jour tous les matchs en direct d'un coup."""
+        changed = set(changed)
+        for match_id in list(self._due):
+            self.record(match_id, match_id in changed, now)
+
+    def defer(self, until: float) -> None:
+        """Repousse à `until` les échéances antérieures (échec de récupération : pas de nouvel essai avant)."""
+        for match_id, due in self._due.items():
+            if due < until:
+                self._due[match_id] = until
+
+    def next_due(self) -> Optional[float]:
+        return min(self._due.values(), default=None)
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+def fetch_game(match_id: int, breaker: Optional[CircuitBreaker] = None) -> Any:
+    url = FEED_GAME_URL.format(id=match_id)
+    return fetch_flights.do(url, lambda: feed_client.get_json(url, breaker).get("Value"))
+
+class FeedPoller:
+    """Récupère le flux en tâche de fond et publie un snapshot immuable lu par toutes les routes."""
+
+    def __init__(self, sources: Tuple[FeedSource, ...], interval: float):
+        self.sources = sources
+        self.url = sources[0].url
+        self.interval = interval
+        # Derniers matchs reçus de chaque source et leur date, réutilisés si elle échoue ensuite (FEED_SOURCE_MAX_STALENESS)
+        self._last_results: Dict[str, Tuple[float, List[dict]]] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._snapshot: Optional[FeedSnapshot] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._flights = SingleFlight("refresh", FEED_FLIGHT_MAX_WAITERS, FEED_FLIGHT_TIMEOUT)
+        self._refresh_due = 0.0
+        # Dernier flux brut complet (y compris les matchs retirés), base des mises à jour match par match :
+        # gardé seulement quand celles-ci sont actives (FEED_GAME_URL), sinon seuls les identifiants le sont
+        self._raw: List[dict] = []
+        self._present: Set[Any] = set()
+        self.live = LiveSchedule(FEED_LIVE_INTERVAL, FEED_LIVE_MAX_INTERVAL, FEED_LIVE_BACKOFF) if FEED_GAME_URL else None
+        self._live_breaker = CircuitBreaker(FEED_BREAKER_THRESHOLD, FEED_BREAKER_COOLDOWN)
+        # Identifiant -> date à laquelle le match a été vu terminé pour la première fois
+        self._finished_since: Dict[Any, float] = {}
+        # Snapshot repris du disque au démarrage : ses analyses ne sont pas réutilisées (code peut-être différent)
+        self._warm = False
+        self._warm_pid: Optional[int] = None
+        # Dernier snapshot pas encore enregistré sur disque et date de la prochaine écriture permise
+        self._unpersisted: Optional[FeedSnapshot] = None
+        self._persist_due = 0.0
+        self._persist_lock = threading.Lock()
+
+    def start(self) -> None:
+        # Le thread ne survit pas à un fork (workers gunicorn) : on le relance par processus
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name="feed-poller", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self) -> None:
+        next_full = 0.0
+        while True:
+            now = time.monotonic()
+            try:
+                if shared_snapshot is None or shared_snapshot.try_lead():
+                    # Trop de matchs en direct à échéance : le flux complet coûte moins de requêtes
+                    if now >= next_full or (self.live is not None and len(self.live.due(now)) > FEED_LIVE_BATCH):
+                        next_full = now + self.interval
+                        if self.refresh() is None and self.live is not None:
+                            # Échec : les matchs en direct restent à échéance, on attend le prochain essai complet
+                            self.live.defer(next_full)
+                    elif self.live is not None:
+                        self.refresh_live()
+                    wake = next_full
+                    if self.live is not None:
+                        wake = min(wake, self.live.next_due() or wake)
+                else:
+                    # Un follower qui reprend la main récupère aussitôt le flux complet
+                    self.follow()
+                    next_full = 0.0
+                    wake = now + SHARED_SNAPSHOT_POLL
+                if self._snapshot is not None:
+                    # Hors requêtes : les structures dérivées déjà demandées sont prêtes pour le nouveau snapshot
+                    warm_snapshot_views(self._snapshot)
+            except Exception as e:
+                # Le thread n'est jamais relancé (start() ne le fait qu'après un fork) : on attend et on réessaie
+                print(f"Erreur dans la boucle du poller: {e}")
+                wake = now + self.interval
+            time.sleep(max(0.0, wake - time.monotonic()))
+
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None or self._executor_pid != os.getpid():
+            workers = max(len(self.sources), FEED_POOL_SIZE if self.live is not None else 1)
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="feed-source")
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _fetch_source(self, source: FeedSource) -> Any:
+        # L'exception est renvoyée, pas levée : l'échec d'une source n'interrompt pas les autres
+        try:
+            with FETCH_SECONDS.time(source.name):
+                if FEED_STREAMING:
+                    return list(stream_feed(source.url, source.breaker))
+                return fetch_feed(source.url, source.breaker)
+        except Exception as e:
+            return e
+
+    def fetch_all(self) -> List[dict]:
+        """Récupère toutes les sources en parallèle : la durée est celle de la plus lente, pas la somme."""
+        # Chaque source garde ses propres délais (connexion, lecture) dans son thread
+        results = list(self.executor().map(self._fetch_source, self.sources))
+        merged = []
+        for source, result in zip(self.sources, results):
+            if isinstance(result, BaseException):
+                FETCH_ERRORS.inc(source.name, type(result).__name__)
+                print(f"Erreur lors de la récupération du flux {source.name}: {result}")
+                last = self._last_results.get(source.name)
+                if last is None:
                     continue
-                if selected_status == "upcoming" and not status_info["is_upcoming"]:
+                received, result = last
+                if time.monotonic() - received > FEED_SOURCE_MAX_STALENESS:
+                    print(f"Derniers matchs du flux {source.name} trop anciens, retirés")
+                    del self._last_results[source.name]
                     continue
-                data.append(m)
-            except Exception as e:
-                print(f"Erreur lors du traitement d'un match: {e}")
+            else:
+                self._last_results[source.name] = (time.monotonic(), result)
+            merged.append(result)
+        if not merged:
+            raise RuntimeError("aucune source du flux n'a répondu")
+        return merge_feeds(merged)
+
+    def refresh(self) -> Optional[FeedSnapshot]:
+        try:
+            if len(self.sources) > 1:
+                matches = self.fetch_all()
+            elif FEED_STREAMING:
+                # En mode continu, chaque match est analysé pendant que la suite du flux se télécharge
+                matches = stream_feed(self.url, self.sources[0].breaker)
+            else:
+                with FETCH_SECONDS.time(self.sources[0].name):
+                    matches = fetch_feed(self.url, self.sources[0].breaker)
+            raw: Optional[List[dict]] = [] if self.live is not None else None
+            present: Set[Any] = set()
+            with STAGE_SECONDS.time("snapshot"):
+                # Après une reprise, tout est ré-analysé une fois (l'analyse a pu changer depuis l'écriture du fichier) ;
+                # les changements restent calculés par rapport au snapshot repris
+                snapshot = build_snapshot(self._visible(matches, raw, present), self._snapshot, reparse=self._warm)
+        except Exception as e:
+            # On conserve le dernier snapshot valide
+            if len(self.sources) == 1:
+                FETCH_ERRORS.inc(self.sources[0].name, type(e).__name__)
+            print(f"Erreur lors de la récupération du flux: {e}")
+            return None
+        self._raw = raw or []
+        self._present = present
+        self._warm = False
+        if self.live is not None:
+            self.live.record_all(snapshot.changes.updated, time.monotonic())
+        self._publish_built(snapshot)
+        return snapshot
+
+    def _fetch_game(self, match_id: int) -> Any:
+        try:
+            return fetch_game(match_id, self._live_breaker)
+        except Exception as e:
+            return e
+
+    def refresh_live(self) -> Optional[FeedSnapshot]:
+        """Récupère un à un les matchs en direct arrivés à échéance ; seuls ceux qui ont changé sont ré-analysés."""
+        snapshot = self._snapshot
+        now = time.monotonic()
+        due = self.live.due(now)
+        if snapshot is None or not due:
+            return None
+        with FETCH_SECONDS.time("live"):
+            games = list(self.executor().map(self._fetch_game, due))
+        positions = {match.get("I"): position for position, match in enumerate(self._raw)}
+        raw = list(self._raw)
+        changed = False
+        for match_id, game in zip(due, games):
+            if not isinstance(game, dict) or match_id not in positions:
+                if isinstance(game, BaseException):
+                    print(f"Erreur lors de la mise à jour du match {match_id}: {game}")
+                LIVE_FETCHES.inc("error")
+                self.live.record(match_id, False, now)
+                continue
+            entry = snapshot.parsed.get(match_id)
+            if entry is not None and entry.digest == _digest(game):
+                LIVE_FETCHES.inc("unchanged")
+                self.live.record(match_id, False, now)
                 continue
+            LIVE_FETCHES.inc("changed")
+            self.live.record(match_id, True, now)
+            raw[positions[match_id]] = game
+            changed = True
+        if not changed:
+            return None
+        try:
+            with STAGE_SECONDS.time("snapshot"):
+                snapshot = build_snapshot(self._visible(raw, None, None), snapshot)
+        except Exception as e:
+            print(f"Erreur lors de la mise à jour des matchs en direct: {e}")
+            return None
+        self._raw = raw
+        self._publish_built(snapshot)
+        return snapshot
 
-        # --- Pagination ---
+    def _visible(self, matches: Iterable[dict], raw: Optional[List[dict]], present: Optional[Set[Any]]) -> Iterator[dict]:
+        """Écarte les matchs terminés depuis plus de FEED_FINISHED_GRACE ; remplit au passage `raw` et `present` s'ils sont fournis."""
+        now = time.time()
+        for match in matches:
+            if raw is not None:
+                raw.append(match)
+            if present is not None:
+                present.add(match.get("I"))
+            since = self._finished_since.get(match.get("I"))
+            if since is None or now - since < FEED_FINISHED_GRACE:
+                yield match
+
+    def _track_finished(self, snapshot: FeedSnapshot) -> None:
+        # Un match retiré reste connu tant que le flux le fournit, pour ne pas réapparaître
+        present = self._present
+        finished = self._finished_since = {match_id: since for match_id, since in self._finished_since.items() if match_id in present}
+        now = time.time()
+        for position in snapshot.by_status.get("finished", ()):
+            match_id = snapshot.records[position].id
+            if match_id is not None:
+                finished.setdefault(match_id, now)
+
+    def _publish_built(self, snapshot: FeedSnapshot) -> None:
+        if FEED_FINISHED_GRACE > 0:
+            self._track_finished(snapshot)
+        if self.live is not None:
+            self.live.sync(snapshot, time.monotonic())
+        self.publish(snapshot)
+        if shared_snapshot is not None:
+            try:
+                shared_snapshot.write(snapshot)
+            except Exception as e:
+                print(f"Erreur lors de la publication du snapshot partagé: {e}")
+        self.persist(snapshot)
+        self.record_history(snapshot)
+
+    def persist(self, snapshot: Optional[FeedSnapshot] = None, force: bool = False) -> None:
+        """Enregistre le dernier snapshot sur disque, au plus une fois par SNAPSHOT_PERSIST_INTERVAL (sans attendre si force)."""
+        if persisted_snapshot is None:
+            return
+        with self._persist_lock:
+            if snapshot is not None:
+                self._unpersisted = snapshot
+            snapshot = self._unpersisted
+            if snapshot is None or (not force and time.monotonic() < self._persist_due):
+                return
+            self._unpersisted = None
+            self._persist_due = time.monotonic() + SNAPSHOT_PERSIST_INTERVAL
+            try:
+                with STAGE_SECONDS.time("persist"):
+                    persisted_snapshot.write(snapshot)
+            except Exception as e:
+                print(f"Erreur lors de l'enregistrement du snapshot sur disque: {e}")
+
+    def follow(self) -> Optional[FeedSnapshot]:
+        """Reprend le snapshot publié par le processus qui récupère le flux, s'il a changé."""
         try:
-            page = int(request.args.get('page', 1))
-        except:
-            page = 1
-        per_page = 20
-        total = len(data)
-        total_pages = (total + per_page - 1) // per_page
-        data_paginated = data[(page-1)*per_page:page*per_page]
-
-        return render_template_string(TEMPLATE, data=[asdict(m) for m in data_paginated],
-            sports=sorted(sports_detected),
-            leagues=sorted(leagues_detected),
+            snapshot = shared_snapshot.load(self._snapshot, SHARED_SNAPSHOT_MAX_AGE)
+        except Exception as e:
+            print(f"Erreur lors de la lecture du snapshot partagé: {e}")
+            return None
+        if snapshot is not None:
+            changed = self._snapshot is None or snapshot.version != self._snapshot.version
+            self.publish(snapshot)
+            if changed:
+                self.record_history(snapshot)
+        return snapshot
+
+    def record_history(self, snapshot: FeedSnapshot) -> None:
+        # Seul le processus qui détient le verrou d'écriture de l'historique écrit réellement
+        if history_store is not None and snapshot.changes:
+            try:
+                history_store.record(snapshot)
+            except Exception as e:
+                HISTORY_ERRORS.inc(type(e).__name__)
+                print(f"Erreur lors de l'enregistrement de l'historique des cotes: {e}")
+
+    def publish(self, snapshot: FeedSnapshot) -> None:
+        self._snapshot = snapshot
+        self._ready.set()
+        broadcaster.publish(snapshot)
+
+    def refresh_if_stale(self) -> None:
+        """Mode à la demande : au plus un rafraîchissement par intervalle, partagé par les requêtes concurrentes."""
+        if time.monotonic() < self._refresh_due:
+            return
+        try:
+            self._flights.do("refresh", self._refresh_on_demand)
+        except FlightError as e:
+            # L'ancien snapshot reste servi ; sans snapshot, get_snapshot attend puis échoue
+            print(f"Rafraîchissement à la demande abandonné: {e}")
+
+    def _refresh_on_demand(self) -> None:
+        # Vérifié à nouveau : une récupération vient peut-être de se terminer
+        if time.monotonic() < self._refresh_due:
+            return
+        try:
+            self.refresh()
+        finally:
+            # Un échec n'est pas retenté avant l'intervalle suivant
+            self._refresh_due = time.monotonic() + self.interval
+
+    def warm_start(self) -> None:
+        """Reprend le dernier snapshot enregistré sur disque, une fois par processus, avant le premier rafraîchissement."""
+        if self._warm_pid == os.getpid():
+            return
+        with self._lock:
+            if self._warm_pid == os.getpid():
+                return
+            self._warm_pid = os.getpid()
+            if persisted_snapshot is None or self._snapshot is not None:
+                return
+            try:
+                with STAGE_SECONDS.time("warm_start"):
+                    snapshot = persisted_snapshot.load(None, SNAPSHOT_MAX_AGE)
+            except Exception as e:
+                print(f"Snapshot enregistré ignoré: {e}")
+                return
+            if snapshot is None:
+                return
+            self._warm = True
+            # Pas d'historique : ces cotes ont déjà été enregistrées par le processus qui a écrit le fichier
+            self.publish(snapshot)
+            # À la demande, le snapshot repris compte comme une récupération faite à sa date
+            self._refresh_due = time.monotonic() + max(0.0, self.interval - (time.time() - snapshot.fetched_at))
+
+    def get_snapshot(self) -> FeedSnapshot:
+        # Avant le poller : un snapshot repris ne doit pas remplacer un snapshot plus récent
+        self.warm_start()
+        if FEED_ON_DEMAND:
+            self.refresh_if_stale()
+        elif FEED_POLLER_ENABLED:
+            self.start()
+        snapshot = self._snapshot
+        if snapshot is None:
+            # À la demande, la récupération vient d'avoir lieu (ou d'échouer) : inutile d'attendre
+            if not FEED_ON_DEMAND:
+                self._ready.wait(FEED_STARTUP_TIMEOUT)
+            snapshot = self._snapshot
+            if snapshot is None:
+                raise RuntimeError("flux indisponible, réessayez dans quelques secondes")
+        return snapshot
+
+feed = FeedPoller(parse_feed_sources(FEED_URL, FEED_SOURCES), FEED_REFRESH_INTERVAL)
+# À l'arrêt du processus, le dernier snapshot retenu par l'intervalle d'écriture est enregistré
+atexit.register(feed.persist, None, True)
+
+PER_PAGE = 20
+
+class LRUCache:
+    def __init__(self, maxsize: int, name: str = ""):
+        self.maxsize = maxsize
+        self.name = name
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+        CACHE_REQUESTS.inc(self.name, "miss" if value is None else "hit")
+        return value
+
+    def put(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+json_cache = LRUCache(RESPONSE_CACHE_SIZE, "json")
+html_cache = LRUCache(HTML_CACHE_SIZE, "html")
+
+def cached_response(snapshot: FeedSnapshot, key: Tuple, build, mimetype: str, cache: LRUCache) -> Response:
+    """Réponse avec ETag fort (contenu du snapshot + paramètres), 304 et gzip ; corps mis en cache par version.
+
+    `build` renvoie le texte du corps ; il n'est appelé qu'une fois par version du snapshot.
+    """
+    tag = f"{snapshot.digest}-{_digest(list(key)).hex()}"
+    use_gzip = "gzip" in request.accept_encodings
+    max_age = int(max(0.0, FEED_REFRESH_INTERVAL - (time.time() - snapshot.fetched_at)))
+    headers = {"Cache-Control": f"public, max-age={max_age}", "Vary": "Accept-Encoding"}
+    # Le suffixe -gz ne marque que les corps réellement compressés : sous GZIP_MIN_SIZE, le client qui
+    # accepte gzip a reçu (et renvoie) l'ETag sans suffixe
+    for etag in ((f"{tag}-gz", tag) if use_gzip else (tag,)):
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304, headers=headers)
+            response.set_etag(etag)
+            return response
+    bodies = cache.get(tag)
+    if bodies is None:
+        body = build().encode()
+        compressed = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+        bodies = (body, compressed)
+        cache.put(tag, bodies)
+    body, compressed = bodies
+    if use_gzip and compressed is not None:
+        response = app.response_class(compressed, mimetype=mimetype, headers=headers)
+        response.headers["Content-Encoding"] = "gzip"
+        response.set_etag(f"{tag}-gz")
+    else:
+        response = app.response_class(body, mimetype=mimetype, headers=headers)
+        response.set_etag(tag)
+    return response
+
+def cached_json_response(snapshot: FeedSnapshot, key: Tuple, build) -> Response:
+    """`build` renvoie l'objet à sérialiser, ou directement le texte JSON."""
+    def serialize() -> str:
+        with STAGE_SECONDS.time("serialize"):
+            payload = build()
+            if not isinstance(payload, str):
+                payload = app.json.dumps(payload, separators=(",", ":"))
+            return payload + "\n"
+    return cached_response(snapshot, key, serialize, "application/json", json_cache)
+
+def cached_html_response(snapshot: FeedSnapshot, key: Tuple, template, context) -> Response:
+    """`context` renvoie les variables du modèle ; il ne dépend que du snapshot et de la clé, la page est partagée par tous."""
+    def render() -> str:
+        with STAGE_SECONDS.time("render"):
+            return template.render(context())
+    return cached_response(snapshot, key, render, "text/html", html_cache)
+
+def paginate(positions: List[int]) -> Tuple[int, int, List[int]]:
+    try:
+        page = int(request.args.get('page', 1))
+    except:
+        page = 1
+    total = len(positions)
+    total_pages = (total + PER_PAGE - 1) // PER_PAGE
+    return page, total_pages, positions[(page-1)*PER_PAGE:page*PER_PAGE]
+
+# --- Structures dérivées du snapshot ---
+class SnapshotView:
+    """Structure calculée à partir d'un snapshot (index de recherche, analyse des cotes), mise en cache par digest.
+
+    Les requêtes concurrentes sur un même snapshot partagent une seule construction ; une fois la vue
+    demandée, le poller la reconstruit à chaque nouveau snapshot pour que les requêtes la trouvent prête.
+    """
+
+    def __init__(self, cache: LRUCache, build):
+        self.cache = cache
+        self.build = build
+        self.used = False
+
+    def get(self, snapshot: FeedSnapshot) -> Any:
+        self.used = True
+        value = self.cache.get(snapshot.digest)
+        if value is None:
+            value = view_flights.do((self.cache.name, snapshot.digest), self._build, snapshot)
+        return value
+
+    def _build(self, snapshot: FeedSnapshot) -> Any:
+        # Construite entre la lecture du cache et le début de la construction partagée
+        value = self.cache.get(snapshot.digest)
+        if value is None:
+            with STAGE_SECONDS.time(self.cache.name):
+                value = self.build(snapshot)
+            self.cache.put(snapshot.digest, value)
+        return value
+
+view_flights = SingleFlight("view", FEED_FLIGHT_MAX_WAITERS, FEED_FLIGHT_TIMEOUT)
+snapshot_views: List[SnapshotView] = []
+
+def warm_snapshot_views(snapshot: FeedSnapshot) -> None:
+    for view in snapshot_views:
+        if view.used:
+            try:
+                view.get(snapshot)
+            except Exception as e:
+                print(f"Erreur lors de la construction de la vue {view.cache.name}: {e}")
+
+# --- Analyse vectorisée des cotes ---
+@dataclass(frozen=True)
+class OddsAnalytics:
+    """Tableaux NumPy parallèles couvrant toutes les cotes d'un snapshot ; les cotes du match i sont [offsets[i], offsets[i+1])."""
+    match_ids: np.ndarray
+    offsets: np.ndarray
+    groups: np.ndarray
+    types: np.ndarray
+    params: np.ndarray
+    prices: np.ndarray
+    implied: np.ndarray
+    # Marché de chaque cote (-1 hors marché à issues exclusives), marge du marché (somme des probabilités
+    # implicites - 1), nombre d'issues distinctes cotées et marché complet (toutes ses issues cotées)
+    market: np.ndarray
+    overround: np.ndarray
+    outcomes: np.ndarray
+    complete: np.ndarray
+    fair: np.ndarray
+    consensus: np.ndarray
+    value: np.ndarray
+    # Par match : nombre de marchés complets et marge moyenne de ces marchés
+    match_markets: np.ndarray
+    match_overround: np.ndarray
+
+# Marchés dont les issues s'excluent mutuellement : famille -> types T du marché (tous doivent être cotés).
+# Double chance, score exact, mi-temps/fin de match et paris spéciaux n'en font pas partie : leur somme
+# de probabilités implicites n'est pas une marge.
+MARKET_FAMILIES = ((1, 2, 3), (7, 8), (9, 10), (11, 12), (13, 14))
+# (G, T) -> indice de la famille dans MARKET_FAMILIES
+ODDS_MARKETS: Dict[Tuple[int, int], int] = {(1, t): 0 for t in MARKET_FAMILIES[0]}
+for _groupe in (2, 8, 15, 62):
+    ODDS_MARKETS.update({(_groupe, t): family for family in range(1, len(MARKET_FAMILIES)) for t in MARKET_FAMILIES[family]})
+ODDS_MARKETS.update({(17, t): 2 for t in MARKET_FAMILIES[2]})
+
+def _market_lookup() -> np.ndarray:
+    lookup = np.full((max(g for g, _ in ODDS_MARKETS) + 1, max(t for _, t in ODDS_MARKETS) + 1), -1, np.int64)
+    for (groupe, t), family in ODDS_MARKETS.items():
+        lookup[groupe, t] = family
+    return lookup
+
+_MARKET_LOOKUP = _market_lookup()
+_MARKET_SIZES = np.array([len(types) for types in MARKET_FAMILIES], np.int64)
+
+def _span_codes(values: np.ndarray) -> Tuple[np.ndarray, int]:
+    # Codes 0..span-1 sans tri (valeurs entières de faible amplitude, cas courant) ; sinon np.unique
+    if not values.size:
+        return values, 1
+    low, high = int(values.min()), int(values.max())
+    if high - low < 1 << 16:
+        return values - low, high - low + 1
+    uniques, codes = np.unique(values, return_inverse=True)
+    return codes, len(uniques)
+
+def compute_odds_analytics(snapshot: FeedSnapshot) -> OddsAnalytics:
+    """Probabilités implicites, marge par marché, probabilités « justes » et values pour tout le snapshot en une passe.
+
+    Un même (G, T, P) coté en E et en AE est une seule issue : seule sa première cote (la plus basse)
+    entre dans les sommes. Un marché regroupe les issues d'un match d'une même famille exclusive
+    (MARKET_FAMILIES) sur une même ligne |P| (1X2, total 2.5, handicap ±1.5...) ; il est complet quand
+    chacun de ses types est coté une fois. Le consensus d'une issue (ligue, G, T, P) est la moyenne de
+    ses probabilités justes sur les matchs du snapshot ; une cote d'un marché complet est une value quand
+    cote x consensus > 1 + VALUE_THRESHOLD.
+    """
+    entries = list(snapshot.parsed.items())
+    matrices = [entry.odds_matrix for _, entry in entries]
+    lengths = np.fromiter((len(m) for m in matrices), np.int64, count=len(matrices))
+    offsets = np.zeros(len(entries) + 1, np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    odds = np.concatenate(matrices) if matrices else np.zeros((0, 4))
+    groups = np.nan_to_num(odds[:, 0], nan=-1).astype(np.int64)
+    types = np.nan_to_num(odds[:, 1], nan=-1).astype(np.int64)
+    params = odds[:, 2]
+    prices = odds[:, 3]
+    match_index = np.repeat(np.arange(len(entries)), lengths)
+    league_codes = {league: code for code, league in enumerate(snapshot.leagues)}
+    league_of_match = np.fromiter((league_codes.get(entry.record.league, 0) for _, entry in entries), np.int64, count=len(entries))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        implied = np.where(prices > 0, 1.0 / prices, np.nan)
+    valid = ~np.isnan(implied)
+    # Paramètre absent ou -1 (pas de ligne) : code 0 ; sinon ligne arrondie au centième
+    has_line = ~np.isnan(params) & (params != -1.0)
+    line = np.where(has_line, np.rint(np.abs(params) * 100) + 1, 0).astype(np.int64)
+    signed_line = np.where(has_line, np.rint(params * 100), 0).astype(np.int64)
+    group_code, group_span = _span_codes(groups)
+    type_code, type_span = _span_codes(types)
+    line_code, line_span = _span_codes(line)
+    signed_code, signed_span = _span_codes(signed_line)
+
+    # Première occurrence de chaque (match, G, T, P) : les cotes d'un match sont triées par cote croissante
+    quote_key = ((match_index * group_span + group_code) * type_span + type_code) * signed_span + signed_code
+    primary = np.zeros(len(prices), bool)
+    primary[np.unique(quote_key, return_index=True)[1]] = True
+
+    family = np.full(len(prices), -1, np.int64)
+    known = (groups >= 0) & (groups < _MARKET_LOOKUP.shape[0]) & (types >= 0) & (types < _MARKET_LOOKUP.shape[1])
+    family[known] = _MARKET_LOOKUP[groups[known], types[known]]
+    member = family >= 0
+    market = np.full(len(prices), -1, np.int64)
+    market_key = ((match_index[member] * group_span + group_code[member]) * len(MARKET_FAMILIES) + family[member]) * line_span + line_code[member]
+    _, first, market[member] = np.unique(market_key, return_index=True, return_inverse=True)
+    first = np.flatnonzero(member)[first]
+    counted = member & primary & valid
+    market_sum = np.bincount(market[counted], weights=implied[counted], minlength=len(first))
+    market_size = np.bincount(market[counted], minlength=len(first))
+    # Types distincts cotés : deux lignes de signes opposés (handicap +1.5 et -1.5 du même côté) ne complètent pas un marché
+    market_types = np.bincount(np.unique(market[counted] * type_span + type_code[counted]) // type_span, minlength=len(first))
+    expected = _MARKET_SIZES[family[first]]
+    market_complete = (market_size == expected) & (market_types == expected)
+
+    outcomes = np.zeros(len(prices), np.int64)
+    outcomes[member] = market_size[market[member]]
+    complete = np.zeros(len(prices), bool)
+    complete[member] = market_complete[market[member]]
+    # Marge d'un marché incomplet : sans signification
+    overround = np.full(len(prices), np.nan)
+    overround[complete] = market_sum[market[complete]] - 1.0
+    priced = complete & valid
+    market_match = match_index[first][market_complete]
+    match_markets = np.bincount(market_match, minlength=len(entries))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        match_overround = np.bincount(market_match, weights=market_sum[market_complete] - 1.0, minlength=len(entries)) / match_markets
+        fair = np.full(len(prices), np.nan)
+        fair[priced] = implied[priced] / market_sum[market[priced]]
+
+    outcome_key = ((league_of_match[match_index] * group_span + group_code) * type_span + type_code) * signed_span + signed_code
+    _, outcome = np.unique(outcome_key, return_inverse=True)
+    sampled = priced & primary
+    samples = np.bincount(outcome, weights=sampled.astype(np.float64))
+    fair_sum = np.bincount(outcome, weights=np.where(sampled, fair, 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        consensus = np.where(samples >= VALUE_MIN_SAMPLES, fair_sum / samples, np.nan)[outcome]
+    value = priced & (prices * consensus > 1.0 + VALUE_THRESHOLD)
+
+    return OddsAnalytics(
+        match_ids=np.array([match_id for match_id, _ in entries], np.int64),
+        offsets=offsets,
+        groups=groups,
+        types=types,
+        params=params,
+        prices=prices,
+        implied=implied,
+        market=market,
+        overround=overround,
+        outcomes=outcomes,
+        complete=complete,
+        fair=fair,
+        consensus=consensus,
+        value=value,
+        match_markets=match_markets,
+        match_overround=match_overround,
+    )
+
+analytics_cache = LRUCache(4, "analytics")
+analytics_view = SnapshotView(analytics_cache, compute_odds_analytics)
+snapshot_views.append(analytics_view)
+
+def get_odds_analytics(snapshot: FeedSnapshot) -> OddsAnalytics:
+    return analytics_view.get(snapshot)
+
+def _rounded(values: np.ndarray, digits: int = 4) -> List[Optional[float]]:
+    return [None if math.isnan(v) else v for v in np.round(values, digits).tolist()]
+
+def match_analytics(snapshot: FeedSnapshot, analytics: OddsAnalytics, position: int) -> Dict[str, Any]:
+    start, end = analytics.offsets[position], analytics.offsets[position + 1]
+    match_id = int(analytics.match_ids[position])
+    entry = snapshot.parsed[match_id]
+    odds = entry.odds
+    team1, team2 = entry.record.team1, entry.record.team2
+    window = slice(start, end)
+    rows = []
+    for i, implied, fair, overround, consensus, value in zip(
+            range(end - start), _rounded(analytics.implied[window]), _rounded(analytics.fair[window]),
+            _rounded(analytics.overround[window]), _rounded(analytics.consensus[window]), analytics.value[window].tolist()):
+        rows.append({
+            "resultat": traduire_pari(odds.groups[i], odds.types[i], odds.params[i], team1, team2),
+            "param": odds.params[i] if odds.params[i] not in [None, -1.0] else "",
+            "cote": odds.prices[i],
+            "proba_implicite": implied,
+            "proba_juste": fair,
+            "marge_marche": overround,
+            "consensus": consensus,
+            "value": value,
+        })
+    return {"id": match_id, "team1": team1, "team2": team2, "odds": rows}
+
+def feed_analytics(analytics: OddsAnalytics) -> Dict[str, Any]:
+    lengths = np.diff(analytics.offsets)
+    match_index = np.repeat(np.arange(len(analytics.match_ids)), lengths)
+    values = np.bincount(match_index[analytics.value], minlength=len(analytics.match_ids))
+    matches = [
+        {"id": match_id, "odds": odds, "marches": markets, "marge_moyenne": overround, "values": count}
+        for match_id, odds, markets, overround, count in zip(
+            analytics.match_ids.tolist(), lengths.tolist(), analytics.match_markets.tolist(),
+            _rounded(analytics.match_overround), values.tolist())
+    ]
+    _, first = np.unique(analytics.market[analytics.complete], return_index=True)
+    market_overround = analytics.overround[analytics.complete][first]
+    return {
+        "odds": int(len(analytics.prices)),
+        "markets": int(market_overround.size),
+        "values": int(analytics.value.sum()),
+        "marge_moyenne": round(float(market_overround.mean()), 4) if market_overround.size else None,
+        "marge_mediane": round(float(np.median(market_overround)), 4) if market_overround.size else None,
+        "value_threshold": VALUE_THRESHOLD,
+        "data": matches,
+    }
+
+# --- Recherche (équipes, ligues, pays) ---
+# Champs indexés et poids dans le classement : équipes, puis ligue, puis nom de ligue et pays
+SEARCH_FIELDS = (("team1", 3.0), ("team2", 3.0), ("league", 2.0), ("league_name", 1.0), ("league_country", 1.0))
+# Un mot trouvé par son début compte moins qu'un mot complet
+SEARCH_PREFIX_FACTOR = 0.6
+# Préfixes courts précalculés ; au-delà, on parcourt la plage des mots triés qui commencent par le préfixe
+SEARCH_PREFIX_MAX = 3
+_SEARCH_TOKEN = re.compile(r"\w+")
+
+@lru_cache(maxsize=16384)
+def normalize_text(text: str) -> str:
+    """Minuscules sans accents : « Équipe Réunion » -> « equipe reunion »."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+def search_tokens(text: Any) -> List[str]:
+    return _SEARCH_TOKEN.findall(normalize_text(text)) if isinstance(text, str) else []
+
+def _merge_best(target: Dict[int, float], postings: Mapping[int, float], factor: float = 1.0) -> None:
+    for position, weight in postings.items():
+        score = weight * factor
+        if score > target.get(position, 0.0):
+            target[position] = score
+
+@dataclass(frozen=True)
+class SearchIndex:
+    """Index inversé d'un snapshot : mot -> {position du match : poids du meilleur champ}."""
+    postings: Mapping[str, Dict[int, float]]
+    prefixes: Mapping[str, Dict[int, float]]
+    words: Tuple[str, ...]
+
+    def _sources(self, token: str) -> List[Tuple[Mapping[int, float], float]]:
+        # (positions, facteur) où chercher le mot : le mot exact, puis les mots qui le prolongent
+        sources = [(self.postings.get(token, {}), 1.0)]
+        if len(token) <= SEARCH_PREFIX_MAX:
+            sources.append((self.prefixes.get(token, {}), SEARCH_PREFIX_FACTOR))
+        else:
+            start = bisect_left(self.words, token)
+            end = bisect_left(self.words, token + "\uffff")
+            sources.extend((self.postings[word], SEARCH_PREFIX_FACTOR) for word in self.words[start:end] if word != token)
+        return sources
+
+    def search(self, tokens: List[str]) -> List[int]:
+        """Positions des matchs contenant tous les mots (ou leurs débuts), les mieux classées d'abord."""
+        if not tokens:
+            return []
+        per_token = sorted((self._sources(token) for token in dict.fromkeys(tokens)),
+                           key=lambda sources: sum(len(positions) for positions, _ in sources))
+        # Candidats tirés du mot le plus sélectif ; les autres mots ne sont consultés que pour ces candidats
+        total: Dict[int, float] = {}
+        for positions, factor in per_token[0]:
+            _merge_best(total, positions, factor)
+        for sources in per_token[1:]:
+            scored = {}
+            for position, score in total.items():
+                best = max(positions.get(position, 0.0) * factor for positions, factor in sources)
+                if best:
+                    scored[position] = score + best
+            total = scored
+        # Tri stable : à score égal, l'ordre du flux
+        return sorted(sorted(total), key=total.__getitem__, reverse=True)
+
+def build_search_index(snapshot: FeedSnapshot) -> SearchIndex:
+    postings: Dict[str, Dict[int, float]] = {}
+    for position, m in enumerate(snapshot.records):
+        details = snapshot.details.get(m.id) if m.id is not None else None
+        values = {"team1": m.team1, "team2": m.team2, "league": m.league}
+        if details is not None:
+            values["league_name"] = details["league_name"]
+            values["league_country"] = details["league_country"]
+        for name, weight in SEARCH_FIELDS:
+            for token in search_tokens(values.get(name)):
+                positions = postings.get(token)
+                if positions is None:
+                    positions = postings[token] = {}
+                if weight > positions.get(position, 0.0):
+                    positions[position] = weight
+    prefixes: Dict[str, Dict[int, float]] = {}
+    for token, positions in postings.items():
+        for size in range(1, min(len(token), SEARCH_PREFIX_MAX) + 1):
+            _merge_best(prefixes.setdefault(token[:size], {}), positions)
+    return SearchIndex(MappingProxyType(postings), MappingProxyType(prefixes), tuple(sorted(postings)))
+
+search_cache = LRUCache(4, "search")
+search_view = SnapshotView(search_cache, build_search_index)
+snapshot_views.append(search_view)
+
+def get_search_index(snapshot: FeedSnapshot) -> SearchIndex:
+    return search_view.get(snapshot)
+
+@app.route('/')
+def home():
+    try:
+        selected_sport = request.args.get("sport", "").strip()
+        selected_league = request.args.get("league", "").strip()
+        selected_status = request.args.get("status", "").strip()
+
+        snapshot = feed.get_snapshot()
+        # Filtres
+        positions = snapshot.query(selected_sport, selected_league, selected_status)
+
+        # --- Pagination ---
+        page, total_pages, positions_paginated = paginate(positions)
+
+        # La page n'est rendue qu'une fois par version du snapshot, filtres et page
+        return cached_html_response(snapshot, ("home", selected_sport, selected_league, selected_status, page), home_page, lambda: dict(
+            data=[snapshot.records[i].to_dict() for i in positions_paginated],
+            sports=snapshot.sports,
+            leagues=snapshot.leagues,
             selected_sport=selected_sport or "Tous",
             selected_league=selected_league or "Toutes",
             selected_status=selected_status or "Tous",
             page=page,
             total_pages=total_pages
-        )
+        ))
 
     except Exception as e:
         return f"Erreur : {e}"
@@ -331,285 +2627,454 @@ def api_matches():
         selected_league = request.args.get("league", "").strip()
         selected_status = request.args.get("status", "").strip()
 
-        api_url = "https://1xbet.com/LiveFeed/Get1x2_VZip?sports=85&count=50&lng=fr&gr=70&mode=4&country=96&getEmpty=true"
-        response = requests.get(api_url)
-        matches = response.json().get("Value", [])
-
-        data: List[MatchData] = []
-        for match in matches:
-            try:
-                m = parse_match(match)
-                # Filtres
-                if selected_sport and m.sport != selected_sport:
-                    continue
-                if selected_league and m.league != selected_league:
-                    continue
-                status_info = parse_status(match, parse_minute(match), m.score1, m.score2)
-                if selected_status == "live" and not status_info["is_live"]:
-                    continue
-                if selected_status == "finished" and not status_info["is_finished"]:
-                    continue
-                if selected_status == "upcoming" and not status_info["is_upcoming"]:
-                    continue
-                data.append(m)
-            except Exception as e:
-                continue
+        snapshot = feed.get_snapshot()
+        # Filtres
+        positions = snapshot.query(selected_sport, selected_league, selected_status)
         # Pagination
-        try:
-            page = int(request.args.get('page', 1))
-        except:
-            page = 1
-        per_page = 20
-        total = len(data)
-        total_pages = (total + per_page - 1) // per_page
-        data_paginated = data[(page-1)*per_page:page*per_page]
-        return jsonify({
-            "data": [asdict(m) for m in data_paginated],
-            "page": page,
-            "total_pages": total_pages
-        })
+        page, total_pages, positions_paginated = paginate(positions)
+        return cached_json_response(
+            snapshot,
+            ("matches", selected_sport, selected_league, selected_status, page),
+            # Lignes déjà sérialisées : on assemble le JSON sans repasser par asdict/json.dumps
+            lambda: '{"data":[%s],"page":%d,"total_pages":%d}' % (
+                ",".join(snapshot.records[i].to_json() for i in positions_paginated), page, total_pages),
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/search')
+def api_search():
+    try:
+        tokens = search_tokens(request.args.get("q", ""))
+        if not tokens:
+            return jsonify({"error": "Paramètre q manquant ou vide"}), 400
+        selected_sport = request.args.get("sport", "").strip()
+        selected_league = request.args.get("league", "").strip()
+        selected_status = request.args.get("status", "").strip()
+
+        snapshot = feed.get_snapshot()
+        positions = get_search_index(snapshot).search(tokens)
+        # Filtres facultatifs, comme pour /api/matches
+        if selected_sport or selected_league or selected_status in STATUS_FILTERS:
+            allowed = set(snapshot.query(selected_sport, selected_league, selected_status))
+            positions = [position for position in positions if position in allowed]
+        page, total_pages, positions_paginated = paginate(positions)
+        return cached_json_response(
+            snapshot,
+            ("search", tuple(tokens), selected_sport, selected_league, selected_status, page),
+            lambda: '{"query":%s,"data":[%s],"page":%d,"total_pages":%d,"total":%d}' % (
+                json.dumps(tokens), ",".join(snapshot.records[i].to_json() for i in positions_paginated),
+                page, total_pages, len(positions)),
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/match/<int:match_id>')
 def api_match_details(match_id):
     try:
-        api_url = "https://1xbet.com/LiveFeed/Get1x2_VZip?sports=85&count=50&lng=fr&gr=70&mode=4&country=96&getEmpty=true"
-        response = requests.get(api_url)
-        matches = response.json().get("Value", [])
-        match = next((m for m in matches if m.get("I") == match_id), None)
-        if not match:
+        snapshot = feed.get_snapshot()
+        details = snapshot.details.get(match_id)
+        if details is None:
             return jsonify({"error": f"Aucun match trouvé pour l'identifiant {match_id}"}), 404
-        team1 = match.get("O1", "–")
-        team2 = match.get("O2", "–")
-        league = match.get("LE", "–")
-        league_name = match.get("CN", "–")
-        league_country = match.get("CE", "–")
-        sport = detect_sport(league)
-        sport_name = match.get("SN", match.get("SE", sport))
-        score1 = parse_score(match.get("SC", {}).get("FS", {}).get("S1"))
-        score2 = parse_score(match.get("SC", {}).get("FS", {}).get("S2"))
-        stats = []
-        st = match.get("SC", {}).get("ST", [])
-        if st and isinstance(st, list) and len(st) > 0 and "Value" in st[0]:
-            for stat in st[0]["Value"]:
-                nom = stat.get("N", "?")
-                s1 = stat.get("S1", "0")
-                s2 = stat.get("S2", "0")
-                stats.append({"nom": nom, "s1": s1, "s2": s2})
-        explication = "Toutes les opportunités de pari virtuel (alternatives uniquement) comprises entre 1.399 et 3 sont listées ci-dessous, avec leur libellé explicite. Les résultats sont issus de simulations virtuelles (FIFA, NBA2K, etc.)."
-        all_predictions = get_all_predictions(match, team1, team2)
-        alt_prediction = get_alternative_prediction(match, team1, team2)
-        return jsonify({
-            "team1": team1,
-            "team2": team2,
-            "league": league,
-            "league_name": league_name,
-            "league_country": league_country,
-            "sport": sport,
-            "sport_name": sport_name,
-            "score1": score1,
-            "score2": score2,
-            "stats": stats,
-            "explication": explication,
-            "all_predictions": all_predictions,
-            "alt_prediction": alt_prediction
-        })
+        return cached_json_response(snapshot, ("match", match_id), lambda: details)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/match/<int:match_id>/history')
+def api_match_history(match_id):
+    try:
+        if history_store is None:
+            return jsonify({"error": "Historique des cotes désactivé"}), 404
+        since = request.args.get("since", type=float)
+        until = request.args.get("until", type=float)
+        snapshot = feed.get_snapshot()
+        entry = snapshot.parsed.get(match_id)
+        team1, team2 = (entry.record.team1, entry.record.team2) if entry is not None else ("–", "–")
+        series: Dict[Tuple[int, int, float], Dict[str, Any]] = {}
+        for ts, groupe, t, param, cote in history_store.history(match_id, since, until):
+            serie = series.get((groupe, t, param))
+            if serie is None:
+                serie = series[(groupe, t, param)] = {
+                    "G": groupe, "T": t, "P": param if param != -1.0 else None,
+                    "resultat": traduire_pari(groupe, t, param if param != -1.0 else None, team1, team2),
+                    "points": [],
+                }
+            serie["points"].append([ts, cote])
+        return jsonify({"id": match_id, "series": list(series.values())})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/analytics')
+def api_analytics():
+    try:
+        snapshot = feed.get_snapshot()
+        match_id = request.args.get("match", type=int)
+        analytics = get_odds_analytics(snapshot)
+        if match_id is None:
+            return cached_json_response(snapshot, ("analytics",), lambda: feed_analytics(analytics))
+        positions = np.flatnonzero(analytics.match_ids == match_id)
+        if not positions.size:
+            return jsonify({"error": f"Aucun match trouvé pour l'identifiant {match_id}"}), 404
+        return cached_json_response(snapshot, ("analytics", match_id),
+                                    lambda: match_analytics(snapshot, analytics, int(positions[0])))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Paris repris dans le tableau des alternatives de la page détails
+ALTERNATIVE_KEYWORDS = ("handicap", "plus de", "moins de", "asiatique")
+
 @app.route('/match/<int:match_id>')
 def match_details(match_id):
     try:
-        api_url = "https://1xbet.com/LiveFeed/Get1x2_VZip?sports=85&count=50&lng=fr&gr=70&mode=4&country=96&getEmpty=true"
-        response = requests.get(api_url)
-        matches = response.json().get("Value", [])
-        match = next((m for m in matches if m.get("I") == match_id), None)
-        if not match:
+        snapshot = feed.get_snapshot()
+        details = snapshot.details.get(match_id)
+        if details is None:
             return f"Aucun match trouvé pour l'identifiant {match_id}"
-        team1 = match.get("O1", "–")
-        team2 = match.get("O2", "–")
-        league = match.get("LE", "–")
-        league_name = match.get("CN", "–")
-        league_country = match.get("CE", "–")
-        sport = detect_sport(league)
-        sport_name = match.get("SN", match.get("SE", sport))
-        score1 = parse_score(match.get("SC", {}).get("FS", {}).get("S1"))
-        score2 = parse_score(match.get("SC", {}).get("FS", {}).get("S2"))
-        stats = []
-        st = match.get("SC", {}).get("ST", [])
-        if st and isinstance(st, list) and len(st) > 0 and "Value" in st[0]:
-            for stat in st[0]["Value"]:
-                nom = stat.get("N", "?")
-                s1 = stat.get("S1", "0")
-                s2 = stat.get("S2", "0")
-                stats.append({"nom": nom, "s1": s1, "s2": s2})
-        explication = "Toutes les opportunités de pari virtuel (alternatives uniquement) comprises entre 1.399 et 3 sont listées ci-dessous, avec leur libellé explicite. Les résultats sont issus de simulations virtuelles (FIFA, NBA2K, etc.)."
-        all_predictions = get_all_predictions(match, team1, team2)
-        alt_prediction = get_alternative_prediction(match, team1, team2)
-        return f'''
-        <!DOCTYPE html>
-        <html><head>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1">
-            <title>Détails du match</title>
-            <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-            <style>
-                body {{ font-family: Arial; padding: 20px; background: #f4f4f4; }}
-                .container {{ max-width: 700px; margin: auto; background: white; border-radius: 10px; box-shadow: 0 2px 8px #ccc; padding: 20px; }}
-                h2 {{ text-align: center; }}
-                .stats-table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
-                .stats-table th, .stats-table td {{ border: 1px solid #ccc; padding: 8px; text-align: center; }}
-                .back-btn {{ margin-bottom: 20px; display: inline-block; }}
-                .pred-table {{ width: 90%; margin: 20px auto 0 auto; border-collapse: collapse; }}
-                .pred-table th, .pred-table td {{ border: 1px solid #aaa; padding: 6px; text-align: center; }}
-                .pred-section {{
-                    border: 3px solid #2196f3;
-                    background: #e3f2fd;
-                    border-radius: 10px;
-                    padding: 18px 12px 12px 12px;
-                    margin: 25px 0 25px 0;
-                    box-shadow: 0 2px 8px #b3e5fc;
-                    transition: box-shadow 0.2s;
-                }}
-                .pred-section:hover {{
-                    box-shadow: 0 4px 16px #90caf9;
-                }}
-                .alt-prediction-section {{
-                    border: 3px solid #ff1744;
-                    background: #ffebee;
-                    border-radius: 10px;
-                    padding: 12px 10px;
-                    margin: 18px 0 18px 0;
-                    font-size: 1.08em;
-                    font-weight: bold;
-                    color: #b71c1c;
-                    box-shadow: 0 0 12px 2px #ff1744, 0 2px 8px #ffcdd2;
-                    display: block;
-                }}
-                .alt-prediction-table-section {{
-                    border: 3px solid #ff1744;
-                    background: #fff3f3;
-                    border-radius: 10px;
-                    padding: 16px 10px 10px 10px;
-                    margin: 18px 0 18px 0;
-                    box-shadow: 0 0 12px 2px #ff1744, 0 2px 8px #ffcdd2;
-                }}
-                .alt-prediction-table {{
-                    width: 98%;
-                    margin: 10px auto 0 auto;
-                    border-collapse: collapse;
-                    background: #fff;
-                }}
-                .alt-prediction-table th, .alt-prediction-table td {{
-                    border: 1.5px solid #ff1744;
-                    padding: 7px 6px;
-                    text-align: center;
-                }}
-                .alt-prediction-best {{
-                    background: #ff1744;
-                    color: #fff;
-                    font-weight: bold;
-                    font-size: 1.08em;
-                }}
-            </style>
-        </head><body>
-            <div class="container">
-                <a href="/" class="back-btn">&larr; Retour à la liste</a>
-                <h2 id="teams">{team1} vs {team2}</h2>
-                <p id="infos"><b>Ligue :</b> {league_name} ({league}) | <b>Pays :</b> {league_country} | <b>Sport :</b> {sport_name}</p>
-                <p id="score"><b>Score :</b> {score1} - {score2}</p>
-                <div class="alt-prediction-table-section">
-                    <div class="alt-prediction-section" id="alt-prediction"><b>Meilleure prédiction alternative :</b> {alt_prediction}</div>
-                    <h4 style="margin-top:10px;">Tableau des alternatives (Handicap & Over/Under, cotes 1.399 à 3)</h4>
-                    <table class="alt-prediction-table" id="alt-prediction-table">
-                        <tr><th>Type de pari</th><th>Cote</th><th>Probabilité estimée</th></tr>
-                        {''.join(f'<tr class="alt-prediction-best">' if i==0 else '<tr>' + f'<td>{{p["resultat"]}}</td><td>{{p["cote"]}}</td><td>{{round(1/float(p["cote"]),3) if p.get("cote") else "-"}}</td></tr>' for i,p in enumerate([pp for pp in all_predictions if any(x in pp["resultat"].lower() for x in ["handicap", "plus de", "moins de", "asiatique"])]) )}
-                    </table>
-                </div>
-                <div id="predictions" class="pred-section">
-                    <h3>Prédictions principales et alternatives (cotes 1.399 à 3)</h3>
-                    <table class="pred-table" id="pred-table">
-                        <tr><th>Pari/prédiction</th><th>Paramètre</th><th>Cote</th></tr>
-                        {''.join(f'<tr><td>{{p["resultat"]}}</td><td>{{p["param"]}}</td><td>{{p["cote"]}}</td></tr>' for p in all_predictions)}
-                    </table>
-                </div>
-                <p id="explication"><b>Explication :</b> {explication}</p>
-                <h3>Statistiques principales</h3>
-                <table class="stats-table">
-                    <tr><th>Statistique</th><th>{team1}</th><th>{team2}</th></tr>
-                    <tbody id="stats-tbody">
-                    {''.join(f'<tr><td>{{s["nom"]}}</td><td>{{s["s1"]}}</td><td>{{s["s2"]}}</td></tr>' for s in stats)}
-                    </tbody>
-                </table>
-                <canvas id="statsChart" height="200"></canvas>
-            </div>
-            <script>
-                function updateMatchDetails() {{
-                    fetch(window.location.pathname.replace('/match/', '/api/match/'))
-                        .then(response => response.json())
-                        .then(data => {{
-                            if(data.error) return;
-                            document.getElementById('teams').textContent = data.team1 + ' vs ' + data.team2;
-                            document.getElementById('infos').innerHTML = `<b>Ligue :</b> ${{data.league_name}} (${{data.league}}) | <b>Pays :</b> ${{data.league_country}} | <b>Sport :</b> ${{data.sport_name}}`;
-                            document.getElementById('score').innerHTML = `<b>Score :</b> ${{data.score1}} - ${{data.score2}}`;
-
-                            // Prédictions principales et alternatives
-                            const predTable = document.getElementById('pred-table');
-                            let predRows = '<tr><th>Pari/prédiction</th><th>Paramètre</th><th>Cote</th></tr>';
-                            data.all_predictions.forEach(function(p) {{
-                                predRows += `<tr><td>${{p.resultat}}</td><td>${{p.param}}</td><td>${{p.cote}}</td></tr>`;
-                            }});
-                            predTable.innerHTML = predRows;
-
-                            // Tableau alternatives (Handicap & Over/Under)
-                            const altTable = document.getElementById('alt-prediction-table');
-                            let altRows = '<tr><th>Type de pari</th><th>Cote</th><th>Probabilité estimée</th></tr>';
-                            let first = true;
-                            data.all_predictions.forEach(function(p) {{
-                                if (p.resultat.toLowerCase().includes('handicap') || p.resultat.toLowerCase().includes('plus de') || p.resultat.toLowerCase().includes('moins de') || p.resultat.toLowerCase().includes('asiatique')) {{
-                                    let proba = p.cote ? (1/parseFloat(p.cote)).toFixed(3) : '-';
-                                    let rowClass = first ? ' class="alt-prediction-best"' : '';
-                                    altRows += `<tr${{rowClass}}><td>${{p.resultat}}</td><td>${{p.cote}}</td><td>${{proba}}</td></tr>`;
-                                    first = false;
-                                }}
-                            }});
-                            altTable.innerHTML = altRows;
-
-                            document.getElementById('alt-prediction').innerHTML = `<b>Meilleure prédiction alternative :</b> ${{data.alt_prediction}}`;
-                            document.getElementById('explication').innerHTML = `<b>Explication :</b> ${{data.explication}}`;
-
-                            // Update stats table
-                            const statsTbody = document.getElementById('stats-tbody');
-                            statsTbody.innerHTML = '';
-                            data.stats.forEach(function(s) {{
-                                statsTbody.innerHTML += `<tr><td>${{s.nom}}</td><td>${{s.s1}}</td><td>${{s.s2}}</td></tr>`;
-                            }});
-                            // Update chart
-                            if(window.statsChart) window.statsChart.destroy();
-                            const labels = data.stats.map(s => s.nom);
-                            const data1 = data.stats.map(s => parseFloat(s.s1.replace(',', '.')) || 0);
-                            const data2 = data.stats.map(s => parseFloat(s.s2.replace(',', '.')) || 0);
-                            window.statsChart = new Chart(document.getElementById('statsChart'), {{
-                                type: 'bar',
-                                data: {{
-                                    labels: labels,
-                                    datasets: [
-                                        {{ label: data.team1, data: data1, backgroundColor: 'rgba(44,62,80,0.7)' }},
-                                        {{ label: data.team2, data: data2, backgroundColor: 'rgba(39,174,96,0.7)' }}
-                                    ]
-                                }},
-                                options: {{ responsive: true, plugins: {{ legend: {{ position: 'top' }} }} }}
-                            }});
-                        }});
-                }}
-                setInterval(updateMatchDetails, 5000); // 5 secondes
-            </script>
-        </body></html>
-        '''
+        return cached_html_response(snapshot, ("match", match_id), match_page, lambda: dict(
+            details,
+            alternatives=[p for p in details["all_predictions"] if any(x in p["resultat"].lower() for x in ALTERNATIVE_KEYWORDS)],
+        ))
     except Exception as e:
         return f"Erreur lors de l'affichage des détails du match : {e}"
 
+class StreamSlots:
+    """Places de flux SSE ; une place est rendue à la fermeture de la réponse, même si le flux n'a jamais démarré."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._open = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self._open >= self.limit:
+                return False
+            self._open += 1
+            SSE_STREAMS.set(self._open)
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._open -= 1
+            SSE_STREAMS.set(self._open)
+
+    def hold(self, iterable: Iterable[str]) -> "_HeldStream":
+        return _HeldStream(iterable, self)
+
+class _HeldStream:
+    def __init__(self, iterable: Iterable[str], slots: StreamSlots):
+        self._iterable = iterable
+        self._slots = slots
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._iterable)
+
+    def close(self) -> None:
+        # Appelée par le serveur WSGI à la fin de la réponse (client parti ou flux terminé)
+        slots, self._slots = self._slots, None
+        if slots is not None:
+            close = getattr(self._iterable, "close", None)
+            if close is not None:
+                close()
+            slots.release()
+
+stream_slots = StreamSlots(SSE_MAX_STREAMS)
+
+def _sse(event: str, data: str, event_id: Optional[int] = None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {data}\n\n"
+
+@app.route('/api/stream')
+def api_stream():
+    selected_sport = request.args.get("sport", "").strip()
+    selected_league = request.args.get("league", "").strip()
+    selected_status = request.args.get("status", "").strip()
+    match_id = request.args.get("match", type=int)
+    last_event_id = request.headers.get("Last-Event-ID")
+    try:
+        snapshot = feed.get_snapshot()
+    except Exception as e:
+        return jsonify({"error": str(e)}), 503
+    if not stream_slots.acquire():
+        # Le navigateur ne se reconnecte pas après un 503 : la page passe au rafraîchissement périodique
+        return jsonify({"error": "trop de flux ouverts"}), 503
+
+    def wanted(key: Optional[Tuple[str, str, str]]) -> bool:
+        if key is None:
+            return False
+        sport, league, status = key
+        if selected_sport and sport != selected_sport:
+            return False
+        if selected_league and league != selected_league:
+            return False
+        if selected_status in STATUS_FILTERS and status != selected_status:
+            return False
+        return True
+
+    def list_event(items: Tuple[DeltaItem, ...]) -> Optional[str]:
+        added, updated, removed = [], [], []
+        for item in items:
+            was, now = wanted(item.old_key), wanted(item.new_key)
+            if now:
+                (updated if was else added).append(item.row_json)
+            elif was or item.new_key is None:
+                removed.append(item.match_id)
+        if not (added or updated or removed):
+            return None
+        return f'{{"added":[{",".join(added)}],"updated":[{",".join(updated)}],"removed":{json.dumps(removed)}}}'
+
+    def generate():
+        version = snapshot.version
+        yield f"retry: 5000\n\n"
+        if last_event_id is not None and last_event_id != str(version):
+            yield _sse("resync", "{}", version)
+        yield _sse("hello", json.dumps({"version": version}), version)
+        if match_id is not None and match_id in snapshot.details:
+            yield _sse("match", json.dumps(snapshot.details[match_id]), version)
+        deadline = time.monotonic() + SSE_MAX_DURATION
+        while time.monotonic() < deadline:
+            current = broadcaster.wait(version, SSE_HEARTBEAT)
+            if current is None or current.version == version:
+                yield ": ping\n\n"
+                continue
+            previous_version, current_version, items = broadcaster.delta()
+            if previous_version != version:
+                # Versions intermédiaires manquées : le client recharge l'état complet
+                yield _sse("resync", "{}", current_version)
+            elif match_id is not None:
+                for item in items:
+                    if item.match_id == match_id and item.details_json is not None:
+                        yield _sse("match", item.details_json, current_version)
+            else:
+                payload = list_event(items)
+                if payload is not None:
+                    yield _sse("delta", payload, current_version)
+            version = current_version
+
+    return app.response_class(stream_slots.hold(generate()), mimetype="text/event-stream",
+                              headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# --- Métriques exposées ---
+# Valeurs lues à la collecte : caches de fonctions, snapshot courant et disjoncteurs
+FUNCTION_CACHES = {"format_match_time": format_match_time, "format_param": _param_label}
+
+def _function_cache_requests() -> Dict[Tuple[str, str], int]:
+    values = {}
+    for name, function in FUNCTION_CACHES.items():
+        info = function.cache_info()
+        values[(name, "hit")] = info.hits
+        values[(name, "miss")] = info.misses
+    return values
+
+def _snapshot_gauge(value) -> Any:
+    def read() -> Dict[Tuple, float]:
+        snapshot = feed._snapshot
+        return {} if snapshot is None else {(): value(snapshot)}
+    return read
+
+Counter("function_cache_requests_total", "Appels des fonctions mises en cache (lru_cache), par résultat.", ("function", "result"),
+        function=_function_cache_requests)
+Gauge("feed_snapshot_version", "Version du snapshot publié.", function=_snapshot_gauge(lambda snapshot: snapshot.version))
+Gauge("feed_snapshot_matches", "Matchs du snapshot publié.", function=_snapshot_gauge(lambda snapshot: len(snapshot.records)))
+Gauge("feed_snapshot_age_seconds", "Âge du snapshot publié.", function=_snapshot_gauge(lambda snapshot: time.time() - snapshot.fetched_at))
+Gauge("feed_shared_leader", "1 si ce processus récupère le flux pour les autres workers (snapshot partagé).",
+      function=lambda: float(shared_snapshot is None or shared_snapshot.leader))
+Gauge("feed_breaker_open", "1 si le disjoncteur de la source est ouvert ou à demi ouvert.", ("source",),
+      function=lambda: {(source.name,): float(source.breaker.state != "closed") for source in feed.sources})
+Gauge("feed_live_scheduled", "Matchs en direct mis à jour individuellement (0 si FEED_GAME_URL est vide).",
+      function=lambda: float(len(feed.live) if feed.live is not None else 0))
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop("request_started", None)
+    endpoint = request.endpoint or "inconnu"
+    if started is not None:
+        HTTP_SECONDS.observe(time.perf_counter() - started, endpoint)
+    HTTP_REQUESTS.inc(endpoint, response.status_code)
+    return response
+
+@app.route('/metrics')
+def metrics_endpoint():
+    # Valeurs propres au processus : avec plusieurs workers, chaque worker expose les siennes
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+# --- Profilage des requêtes (piles échantillonnées) ---
+class StackSampler:
+    """Relève la pile d'un thread à intervalle régulier depuis un thread annexe.
+
+    Piles au format « replié » : module:fonction:ligne de la racine à la feuille, séparés par « ; ».
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    # Le thread échantillonneur n'obtient le GIL qu'à chaque changement de thread (5 ms par défaut) :
+    # l'intervalle est réduit tant qu'au moins un profil est en cours
+    _active = 0
+    _switch_interval = 0.0
+    _lock = threading.Lock()
+
+    def start(self) -> None:
+        with StackSampler._lock:
+            if StackSampler._active == 0:
+                StackSampler._switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(min(StackSampler._switch_interval, self.interval / 2))
+            StackSampler._active += 1
+        self._thread.start()
+
+    def stop(self) -> Dict[str, int]:
+        self._stop.set()
+        self._thread.join()
+        with StackSampler._lock:
+            StackSampler._active -= 1
+            if StackSampler._active == 0:
+                sys.setswitchinterval(StackSampler._switch_interval)
+        return self.stacks
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}:{code.co_firstlineno}")
+                frame = frame.f_back
+            if frames:
+                stack = ";".join(reversed(frames))
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+@dataclass(frozen=True)
+class RequestProfile:
+    id: str
+    method: str
+    path: str
+    endpoint: str
+    status: int
+    started_at: float
+    duration: float
+    samples: int
+    stacks: Mapping[str, int] = field(repr=False)
+    file: Optional[str] = None
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def top_frames(self, limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """Fonctions les plus présentes : en feuille de pile (temps propre) et n'importe où dans la pile (temps inclus)."""
+        own: Dict[str, int] = {}
+        inclusive: Dict[str, int] = {}
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] = own.get(frames[-1], 0) + count
+            for frame in set(frames):
+                inclusive[frame] = inclusive.get(frame, 0) + count
+
+        def ranked(counts: Dict[str, int]) -> List[Dict[str, Any]]:
+            best = sorted(counts.items(), key=itemgetter(1), reverse=True)[:limit]
+            return [{"frame": frame, "samples": count, "part": round(count / self.samples, 3)} for frame, count in best]
+        return {"self": ranked(own), "inclusive": ranked(inclusive)}
+
+    def summary(self) -> Dict[str, Any]:
+        return {"id": self.id, "method": self.method, "path": self.path, "endpoint": self.endpoint, "status": self.status,
+                "started_at": self.started_at, "duration_ms": round(self.duration * 1000, 3), "samples": self.samples,
+                "file": self.file}
+
+class ProfileStore:
+    """Derniers profils gardés en mémoire ; le fichier .folded d'un profil évincé est supprimé."""
+
+    def __init__(self, directory: str, keep: int):
+        self.directory = directory
+        self.keep = keep
+        self._profiles: "deque[RequestProfile]" = deque()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def add(self, method: str, path: str, endpoint: str, status: int, started_at: float, duration: float,
+            stacks: Dict[str, int]) -> RequestProfile:
+        profile_id = f"{int(started_at)}-{os.getpid()}-{next(self._ids)}"
+        profile = RequestProfile(profile_id, method, path, endpoint, status, started_at, duration,
+                                 sum(stacks.values()), MappingProxyType(stacks))
+        if self.directory and stacks:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                filename = os.path.join(self.directory, f"{profile_id}-{endpoint}.folded")
+                with open(filename, "w", encoding="utf-8") as f:
+                    f.write(profile.collapsed())
+                profile = replace(profile, file=filename)
+            except OSError as e:
+                print(f"Erreur lors de l'écriture du profil {profile_id}: {e}")
+        with self._lock:
+            self._profiles.append(profile)
+            evicted = [self._profiles.popleft() for _ in range(len(self._profiles) - self.keep)]
+        for old in evicted:
+            if old.file:
+                try:
+                    os.remove(old.file)
+                except OSError:
+                    pass
+        return profile
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return next((profile for profile in self._profiles if profile.id == profile_id), None)
+
+    def slowest(self, limit: int) -> List[RequestProfile]:
+        with self._lock:
+            recent = list(self._profiles)
+        return sorted(recent, key=lambda profile: profile.duration, reverse=True)[:limit]
+
+profiles = ProfileStore(PROFILE_DIR, PROFILE_KEEP)
+
+def _profile_requested() -> bool:
+    if request.endpoint in ("api_profiles", "api_profile", "metrics_endpoint", "static"):
+        return False
+    if PROFILE_ENABLED and (request.headers.get("X-Profile") or "profile" in request.args):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+@app.before_request
+def start_profiling():
+    if (PROFILE_ENABLED or PROFILE_SAMPLE_RATE > 0) and _profile_requested():
+        sampler = StackSampler(threading.get_ident(), PROFILE_INTERVAL)
+        g.profile = (sampler, time.time(), time.perf_counter())
+        sampler.start()
+
+@app.after_request
+def stop_profiling(response):
+    # Seul le gestionnaire est mesuré : le corps d'une réponse en flux (SSE) est produit après
+    profiling = g.pop("profile", None)
+    if profiling is not None:
+        sampler, started_at, started = profiling
+        stacks = sampler.stop()
+        profile = profiles.add(request.method, request.full_path.rstrip("?"), request.endpoint or "inconnu",
+                               response.status_code, started_at, time.perf_counter() - started, stacks)
+        response.headers["X-Profile-Id"] = profile.id
+    return response
+
+@app.route('/api/profiles')
+def api_profiles():
+    limit = request.args.get("limit", 20, type=int)
+    return jsonify({"interval": PROFILE_INTERVAL, "sample_rate": PROFILE_SAMPLE_RATE,
+                    "data": [dict(profile.summary(), top=profile.top_frames(5)) for profile in profiles.slowest(limit)]})
+
+@app.route('/api/profiles/<profile_id>')
+def api_profile(profile_id):
+    profile = profiles.get(profile_id)
+    if profile is None:
+        return jsonify({"error": f"Aucun profil trouvé pour l'identifiant {profile_id}"}), 404
+    if request.args.get("format") == "json":
+        return jsonify(dict(profile.summary(), top=profile.top_frames(), stacks=dict(profile.stacks)))
+    # Format « replié » lu par flamegraph.pl, speedscope ou inferno
+    return Response(profile.collapsed(), content_type="text/plain; charset=utf-8")
+
 TEMPLATE = """<!DOCTYPE html>
 <html><head>
     <meta charset="utf-8">
@@ -660,6 +3125,16 @@ TEMPLATE = """<!DOCTYPE html>
                     document.getElementById('loader').style.display = 'flex';
                 });
             });
+            const tbody = document.getElementById('matches-tbody');
+            function rowHtml(m) {
+                return `
+        <tr data-id="${m.id}">
+            <td>${m.team1}</td><td>${m.score1}</td><td>${m.score2}</td><td>${m.team2}</td>
+            <td>${m.sport}</td><td>${m.league}</td><td>${m.status}</td><td>${m.datetime}</td>
+            <td>${m.temp}°C</td><td>${m.humid}%</td><td>${m.odds.join(' | ')}</td><td>${m.prediction}</td>
+            <td>${m.id ? `<a href='/match/${m.id}'><button>Détails</button></a>` : '–'}</td>
+        </tr>`;
+            }
             // Rafraîchissement automatique du tableau
             function fetchMatches() {
                 const params = new URLSearchParams(window.location.search);
@@ -667,21 +3142,36 @@ TEMPLATE = """<!DOCTYPE html>
                     .then(response => response.json())
                     .then(json => {
                         if(json.data) {
-                            const tbody = document.getElementById('matches-tbody');
-                            tbody.innerHTML = '';
-                            json.data.forEach(function(m) {
-                                tbody.innerHTML += `
-        <tr>
-            <td>${m.team1}</td><td>${m.score1}</td><td>${m.score2}</td><td>${m.team2}</td>
-            <td>${m.sport}</td><td>${m.league}</td><td>${m.status}</td><td>${m.datetime}</td>
-            <td>${m.temp}°C</td><td>${m.humid}%</td><td>${m.odds.join(' | ')}</td><td>${m.prediction}</td>
-            <td>${m.id ? `<a href='/match/${m.id}'><button>Détails</button></a>` : '–'}</td>
-        </tr>`;
-                            });
+                            tbody.innerHTML = json.data.map(rowHtml).join('');
                         }
                     });
             }
-            setInterval(fetchMatches, 20000); // 20 secondes
+            // Deltas poussés par le serveur : mise à jour des lignes en place, rechargement de la page
+            // courante seulement si des matchs entrent ou sortent du filtre
+            if (window.EventSource) {
+                const params = new URLSearchParams(window.location.search);
+                params.delete('page');
+                const source = new EventSource('/api/stream?' + params.toString());
+                source.addEventListener('delta', function(e) {
+                    const delta = JSON.parse(e.data);
+                    let refetch = delta.added.length > 0;
+                    delta.updated.forEach(function(m) {
+                        const row = tbody.querySelector(`tr[data-id="${m.id}"]`);
+                        if (row) row.outerHTML = rowHtml(m);
+                    });
+                    delta.removed.forEach(function(id) {
+                        if (tbody.querySelector(`tr[data-id="${id}"]`)) refetch = true;
+                    });
+                    if (refetch) fetchMatches();
+                });
+                source.addEventListener('resync', fetchMatches);
+                // Flux refusé (serveur saturé) : le navigateur abandonne, on passe au rafraîchissement périodique
+                source.addEventListener('error', function() {
+                    if (source.readyState === EventSource.CLOSED) setInterval(fetchMatches, 20000);
+                });
+            } else {
+                setInterval(fetchMatches, 20000); // 20 secondes
+            }
         });
     </script>
 </head><body>
@@ -739,7 +3229,7 @@ TEMPLATE = """<!DOCTYPE html>
         </tr>
         <tbody id="matches-tbody">
         {% for m in data %}
-        <tr>
+        <tr data-id="{{m.id}}">
             <td>{{m.team1}}</td><td>{{m.score1}}</td><td>{{m.score2}}</td><td>{{m.team2}}</td>
             <td>{{m.sport}}</td><td>{{m.league}}</td><td>{{m.status}}</td><td>{{m.datetime}}</td>
             <td>{{m.temp}}°C</td><td>{{m.humid}}%</td><td>{{m.odds|join(" | ")}}</td><td>{{m.prediction}}</td>
@@ -750,6 +3240,223 @@ TEMPLATE = """<!DOCTYPE html>
     </table>
 </body></html>"""
 
+MATCH_TEMPLATE = """<!DOCTYPE html>
+<html><head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <title>Détails du match</title>
+    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    <style>
+        body { font-family: Arial; padding: 20px; background: #f4f4f4; }
+        .container { max-width: 700px; margin: auto; background: white; border-radius: 10px; box-shadow: 0 2px 8px #ccc; padding: 20px; }
+        h2 { text-align: center; }
+        .stats-table { width: 100%; border-collapse: collapse; margin-top: 20px; }
+        .stats-table th, .stats-table td { border: 1px solid #ccc; padding: 8px; text-align: center; }
+        .back-btn { margin-bottom: 20px; display: inline-block; }
+        .pred-table { width: 90%; margin: 20px auto 0 auto; border-collapse: collapse; }
+        .pred-table th, .pred-table td { border: 1px solid #aaa; padding: 6px; text-align: center; }
+        .pred-section {
+            border: 3px solid #2196f3;
+            background: #e3f2fd;
+            border-radius: 10px;
+            padding: 18px 12px 12px 12px;
+            margin: 25px 0 25px 0;
+            box-shadow: 0 2px 8px #b3e5fc;
+            transition: box-shadow 0.2s;
+        }
+        .pred-section:hover {
+            box-shadow: 0 4px 16px #90caf9;
+        }
+        .alt-prediction-section {
+            border: 3px solid #ff1744;
+            background: #ffebee;
+            border-radius: 10px;
+            padding: 12px 10px;
+            margin: 18px 0 18px 0;
+            font-size: 1.08em;
+            font-weight: bold;
+            color: #b71c1c;
+            box-shadow: 0 0 12px 2px #ff1744, 0 2px 8px #ffcdd2;
+            display: block;
+        }
+        .alt-prediction-table-section {
+            border: 3px solid #ff1744;
+            background: #fff3f3;
+            border-radius: 10px;
+            padding: 16px 10px 10px 10px;
+            margin: 18px 0 18px 0;
+            box-shadow: 0 0 12px 2px #ff1744, 0 2px 8px #ffcdd2;
+        }
+        .alt-prediction-table {
+            width: 98%;
+            margin: 10px auto 0 auto;
+            border-collapse: collapse;
+            background: #fff;
+        }
+        .alt-prediction-table th, .alt-prediction-table td {
+            border: 1.5px solid #ff1744;
+            padding: 7px 6px;
+            text-align: center;
+        }
+        .alt-prediction-best {
+            background: #ff1744;
+            color: #fff;
+            font-weight: bold;
+            font-size: 1.08em;
+        }
+    </style>
+</head><body>
+    <div class="container">
+        <a href="/" class="back-btn">&larr; Retour à la liste</a>
+        <h2 id="teams">{{ team1 }} vs {{ team2 }}</h2>
+        <p id="infos"><b>Ligue :</b> {{ league_name }} ({{ league }}) | <b>Pays :</b> {{ league_country }} | <b>Sport :</b> {{ sport_name }}</p>
+        <p id="score"><b>Score :</b> {{ score1 }} - {{ score2 }}</p>
+        <div class="alt-prediction-table-section">
+            <div class="alt-prediction-section" id="alt-prediction"><b>Meilleure prédiction alternative :</b> {{ alt_prediction }}</div>
+            <h4 style="margin-top:10px;">Tableau des alternatives (Handicap & Over/Under, cotes 1.399 à 3)</h4>
+            <table class="alt-prediction-table" id="alt-prediction-table">
+                <tr><th>Type de pari</th><th>Cote</th><th>Probabilité estimée</th></tr>
+                {% for p in alternatives %}
+                <tr{% if loop.first %} class="alt-prediction-best"{% endif %}><td>{{ p.resultat }}</td><td>{{ p.cote }}</td><td>{{ (1 / p.cote|float)|round(3) if p.cote else "-" }}</td></tr>
+                {% endfor %}
+            </table>
+        </div>
+        <div id="predictions" class="pred-section">
+            <h3>Prédictions principales et alternatives (cotes 1.399 à 3)</h3>
+            <table class="pred-table" id="pred-table">
+                <tr><th>Pari/prédiction</th><th>Paramètre</th><th>Cote</th></tr>
+                {% for p in all_predictions %}
+                <tr><td>{{ p.resultat }}</td><td>{{ p.param }}</td><td>{{ p.cote }}</td></tr>
+                {% endfor %}
+            </table>
+        </div>
+        <p id="explication"><b>Explication :</b> {{ explication }}</p>
+        <h3>Statistiques principales</h3>
+        <table class="stats-table">
+            <tr><th>Statistique</th><th>{{ team1 }}</th><th>{{ team2 }}</th></tr>
+            <tbody id="stats-tbody">
+            {% for s in stats %}
+            <tr><td>{{ s.nom }}</td><td>{{ s.s1 }}</td><td>{{ s.s2 }}</td></tr>
+            {% endfor %}
+            </tbody>
+        </table>
+        <canvas id="statsChart" height="200"></canvas>
+        <h3>Évolution des cotes (1.399 à 3)</h3>
+        <canvas id="oddsChart" height="200"></canvas>
+    </div>
+    <script>
+        function renderMatchDetails(data) {
+                    document.getElementById('teams').textContent = data.team1 + ' vs ' + data.team2;
+                    document.getElementById('infos').innerHTML = `<b>Ligue :</b> ${data.league_name} (${data.league}) | <b>Pays :</b> ${data.league_country} | <b>Sport :</b> ${data.sport_name}`;
+                    document.getElementById('score').innerHTML = `<b>Score :</b> ${data.score1} - ${data.score2}`;
+
+                    // Prédictions principales et alternatives
+                    const predTable = document.getElementById('pred-table');
+                    let predRows = '<tr><th>Pari/prédiction</th><th>Paramètre</th><th>Cote</th></tr>';
+                    data.all_predictions.forEach(function(p) {
+                        predRows += `<tr><td>${p.resultat}</td><td>${p.param}</td><td>${p.cote}</td></tr>`;
+                    });
+                    predTable.innerHTML = predRows;
+
+                    // Tableau alternatives (Handicap & Over/Under)
+                    const altTable = document.getElementById('alt-prediction-table');
+                    let altRows = '<tr><th>Type de pari</th><th>Cote</th><th>Probabilité estimée</th></tr>';
+                    let first = true;
+                    data.all_predictions.forEach(function(p) {
+                        if (p.resultat.toLowerCase().includes('handicap') || p.resultat.toLowerCase().includes('plus de') || p.resultat.toLowerCase().includes('moins de') || p.resultat.toLowerCase().includes('asiatique')) {
+                            let proba = p.cote ? (1/parseFloat(p.cote)).toFixed(3) : '-';
+                            let rowClass = first ? ' class="alt-prediction-best"' : '';
+                            altRows += `<tr${rowClass}><td>${p.resultat}</td><td>${p.cote}</td><td>${proba}</td></tr>`;
+                            first = false;
+                        }
+                    });
+                    altTable.innerHTML = altRows;
+
+                    document.getElementById('alt-prediction').innerHTML = `<b>Meilleure prédiction alternative :</b> ${data.alt_prediction}`;
+                    document.getElementById('explication').innerHTML = `<b>Explication :</b> ${data.explication}`;
+
+                    // Update stats table
+                    const statsTbody = document.getElementById('stats-tbody');
+                    statsTbody.innerHTML = '';
+                    data.stats.forEach(function(s) {
+                        statsTbody.innerHTML += `<tr><td>${s.nom}</td><td>${s.s1}</td><td>${s.s2}</td></tr>`;
+                    });
+                    // Update chart
+                    if(window.statsChart) window.statsChart.destroy();
+                    const labels = data.stats.map(s => s.nom);
+                    const data1 = data.stats.map(s => parseFloat(s.s1.replace(',', '.')) || 0);
+                    const data2 = data.stats.map(s => parseFloat(s.s2.replace(',', '.')) || 0);
+                    window.statsChart = new Chart(document.getElementById('statsChart'), {
+                        type: 'bar',
+                        data: {
+                            labels: labels,
+                            datasets: [
+                                { label: data.team1, data: data1, backgroundColor: 'rgba(44,62,80,0.7)' },
+                                { label: data.team2, data: data2, backgroundColor: 'rgba(39,174,96,0.7)' }
+                            ]
+                        },
+                        options: { responsive: true, plugins: { legend: { position: 'top' } } }
+                    });
+        }
+        function updateOddsHistory() {
+            fetch(window.location.pathname.replace('/match/', '/api/match/') + '/history')
+                .then(response => response.json())
+                .then(data => {
+                    if(data.error || !data.series) return;
+                    // Au plus 8 séries, dont la dernière cote est dans la plage des prédictions
+                    const series = data.series.filter(s => {
+                        const last = s.points[s.points.length - 1][1];
+                        return last >= 1.399 && last <= 3;
+                    }).slice(0, 8);
+                    if(window.oddsChart) window.oddsChart.destroy();
+                    window.oddsChart = new Chart(document.getElementById('oddsChart'), {
+                        type: 'line',
+                        data: {
+                            datasets: series.map(s => ({
+                                label: s.resultat,
+                                data: s.points.map(p => ({ x: p[0] * 1000, y: p[1] })),
+                                stepped: true
+                            }))
+                        },
+                        options: {
+                            responsive: true,
+                            parsing: false,
+                            scales: { x: { type: 'linear', ticks: { callback: v => new Date(v).toLocaleTimeString() } } },
+                            plugins: { legend: { position: 'top' } }
+                        }
+                    });
+                });
+        }
+        function updateMatchDetails() {
+            updateOddsHistory();
+            fetch(window.location.pathname.replace('/match/', '/api/match/'))
+                .then(response => response.json())
+                .then(data => {
+                    if(data.error) return;
+                    renderMatchDetails(data);
+                });
+        }
+        // Mises à jour poussées par le serveur, sinon rafraîchissement périodique
+        if (window.EventSource) {
+            const source = new EventSource('/api/stream?match=' + window.location.pathname.split('/').pop());
+            source.addEventListener('match', function(e) {
+                renderMatchDetails(JSON.parse(e.data));
+                updateOddsHistory();
+            });
+            source.addEventListener('resync', updateMatchDetails);
+            source.addEventListener('error', function() {
+                if (source.readyState === EventSource.CLOSED) setInterval(updateMatchDetails, 5000);
+            });
+        } else {
+            setInterval(updateMatchDetails, 5000); // 5 secondes
+        }
+    </script>
+</body></html>"""
+
+# Modèles compilés une seule fois au démarrage (render_template_string recompile à chaque appel)
+home_page = app.jinja_env.from_string(TEMPLATE)
+match_page = app.jinja_env.from_string(MATCH_TEMPLATE)
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port)
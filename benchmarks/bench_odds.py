@@ -0,0 +1,183 @@
+"""Micro-benchmark de l'extraction des cotes : un seul parcours (extract_odds) contre les anciens parcours séparés.
+
+Vérifie d'abord que parse_odds, get_prediction, get_all_predictions et get_alternative_prediction
+donnent le même résultat que leurs versions d'origine sur des matchs aléatoires (cotes égales entre
+E et AE, paramètres absents ou non numériques, bornes de la plage 1.399-3), puis mesure le coût par
+match sur le flux de référence.
+
+    python benchmarks/bench_odds.py
+    python benchmarks/bench_odds.py --matches 5000 --seed 7 --size 5000
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+from typing import List
+
+os.environ.setdefault("FEED_POLLER_ENABLED", "0")
+os.environ.setdefault("ODDS_HISTORY_DIR", "")
+os.environ.setdefault("SNAPSHOT_PERSIST_DIR", "")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from feed_fixtures import load_feed  # noqa: E402
+from app import (extract_odds, get_all_predictions, get_alternative_prediction, get_prediction,  # noqa: E402
+                 parse_odds, traduire_pari)
+
+
+# Implémentations d'origine (un parcours de E / AE par fonction), conservées comme référence
+def parse_odds_reference(match: dict) -> List[str]:
+    odds_data = []
+    for o in match.get("E", []):
+        if o.get("G") == 1 and o.get("T") in [1, 2, 3] and o.get("C") is not None:
+            odds_data.append(f"{ {1: '1', 2: '2', 3: 'X'}[o.get('T')] }: {o.get('C')}")
+    if not odds_data:
+        odds_data = ["Pas de cotes disponibles"]
+    return odds_data
+
+
+def get_prediction_reference(match: dict, team1: str, team2: str) -> str:
+    best = None
+    best_type = None
+    for o in match.get("E", []):
+        if o.get("G") == 1 and o.get("T") in [1, 2, 3] and o.get("C") is not None:
+            if best is None or o.get("C") < best:
+                best = o.get("C")
+                best_type = o.get("T")
+    if best_type == 1:
+        return f"{team1} gagne"
+    elif best_type == 2:
+        return f"{team2} gagne"
+    elif best_type == 3:
+        return "Match nul"
+    return "–"
+
+
+def get_all_predictions_reference(match: dict, team1: str, team2: str) -> list:
+    predictions = []
+    for o in match.get("E", []):
+        cote = o.get("C")
+        if cote is not None and 1.399 <= cote <= 3:
+            t = o.get("T")
+            groupe = o.get("G")
+            param = o.get("P") if "P" in o else None
+            label = traduire_pari(groupe, t, param, team1, team2)
+            predictions.append({"resultat": label, "param": param if param not in [None, -1.0] else "", "cote": cote})
+    for ae in match.get("AE", []):
+        groupe = ae.get("G")
+        for o in ae.get("ME", []):
+            cote = o.get("C")
+            if cote is not None and 1.399 <= cote <= 3:
+                t = o.get("T")
+                param = o.get("P") if "P" in o else None
+                label = traduire_pari(groupe, t, param, team1, team2)
+                predictions.append({"resultat": label, "param": param if param not in [None, -1.0] else "", "cote": cote})
+    predictions.sort(key=lambda x: x["cote"])
+    return predictions
+
+
+def get_alternative_prediction_reference(match: dict, team1: str, team2: str) -> str:
+    meilleures = []
+    for ae in match.get("AE", []):
+        groupe = ae.get("G")
+        for o in ae.get("ME", []):
+            cote = o.get("C")
+            if cote is not None and 1.399 <= cote <= 3:
+                t = o.get("T")
+                param = o.get("P") if "P" in o else None
+                label = traduire_pari(groupe, t, param, team1, team2)
+                meilleures.append((cote, label, param, groupe, t))
+    if meilleures:
+        meilleures.sort(key=lambda x: x[0])
+        cote, label, param, groupe, t = meilleures[0]
+        return f"{label} [{cote}]"
+    return "Aucune cote alternative dans la plage (1.399 à 3)"
+
+
+# Peu de valeurs distinctes : beaucoup d'égalités, dans E comme entre E et AE
+PRICES = [None, 1.0, 1.25, 1.398, 1.399, 1.4, 1.5, 1.85, 2, 2.0, 2.5, 3, 3.0, 3.001, 4.2, 12]
+PARAMS = [None, -1.0, 0, 1.5, -1.5, 2.5, 0.25, "2-1"]
+PAIRS = [(1, 1), (1, 2), (1, 3), (1, 4), (8, 4), (8, 6), (2, 7), (2, 8), (17, 9), (17, 10), (15, 11),
+         (62, 13), (4, 5), (5, 16), (19, 180), (99, 1), (None, 1), (1, None)]
+
+
+def random_odd(rng: random.Random, in_group: bool = False) -> dict:
+    g, t = rng.choice(PAIRS)
+    odd = {"T": t, "C": rng.choice(PRICES)}
+    if not in_group:
+        odd["G"] = g
+    param = rng.choice(PARAMS)
+    if param is not None or rng.random() < 0.2:
+        odd["P"] = param
+    if rng.random() < 0.05:
+        del odd["C"]
+    return odd
+
+
+def random_match(rng: random.Random) -> dict:
+    match = {"E": [random_odd(rng) for _ in range(rng.randint(0, 12))]}
+    if rng.random() < 0.8:
+        match["AE"] = [{"G": rng.choice(PAIRS)[0], "ME": [random_odd(rng, in_group=True) for _ in range(rng.randint(0, 6))]}
+                       for _ in range(rng.randint(0, 4))]
+        # Copie exacte d'une cote de E dans AE : même cote, ordre à départager par la position
+        if match["E"] and match["AE"]:
+            match["AE"][0]["ME"].append({k: v for k, v in rng.choice(match["E"]).items() if k != "G"})
+    return match
+
+
+def check_identical(matches: List[dict]) -> int:
+    team1, team2 = "Équipe A", "Équipe B"
+    for match in matches:
+        odds = extract_odds(match)
+        assert parse_odds(match, odds) == parse_odds_reference(match), match
+        assert get_prediction(match, team1, team2, odds) == get_prediction_reference(match, team1, team2), match
+        assert get_all_predictions(match, team1, team2, odds) == get_all_predictions_reference(match, team1, team2), match
+        assert get_alternative_prediction(match, team1, team2, odds) == get_alternative_prediction_reference(match, team1, team2), match
+    return len(matches)
+
+
+def separate(match: dict) -> None:
+    parse_odds_reference(match)
+    get_prediction_reference(match, "Équipe A", "Équipe B")
+    get_all_predictions_reference(match, "Équipe A", "Équipe B")
+    get_alternative_prediction_reference(match, "Équipe A", "Équipe B")
+
+
+def single_pass(match: dict) -> None:
+    odds = extract_odds(match)
+    parse_odds(match, odds)
+    get_prediction(match, "Équipe A", "Équipe B", odds)
+    get_all_predictions(match, "Équipe A", "Équipe B", odds)
+    get_alternative_prediction(match, "Équipe A", "Équipe B", odds)
+
+
+def bench(func, matches: List[dict], repeat: int = 5) -> float:
+    def run():
+        for match in matches:
+            func(match)
+    return min(timeit.repeat(run, number=1, repeat=repeat)) / len(matches)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matches", type=int, default=20_000, help="matchs aléatoires vérifiés")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--size", type=int, default=500, help="matchs du flux de référence mesurés")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    matches = [random_match(rng) for _ in range(args.matches)]
+    print(f"{check_identical(matches)} matchs aléatoires identiques")
+    feed = load_feed(args.size)["Value"]
+    print(f"{check_identical(feed)} matchs du flux de référence identiques")
+    before = bench(separate, feed)
+    after = bench(single_pass, feed)
+    print(f"parcours séparés : {before * 1e6:8.2f} µs/match")
+    print(f"parcours unique  : {after * 1e6:8.2f} µs/match")
+    print(f"gain             : x{before / after:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Micro-benchmark du décodage JSON incrémental (iter_json_array) contre json.loads du corps complet.
+
+Vérifie d'abord que les éléments produits sont identiques quel que soit le découpage en morceaux
+(1, 2, 3 et 7 octets, tailles aléatoires) : nombres, chaînes échappées et caractères UTF-8 multi-octets
+coupés entre deux morceaux, clés avant et après le tableau ; puis mesure le débit par taille de morceau.
+
+    python benchmarks/bench_stream.py
+    python benchmarks/bench_stream.py --size 5000 --chunks 1024,16384,65536
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Iterator, List
+
+os.environ.setdefault("FEED_POLLER_ENABLED", "0")
+os.environ.setdefault("ODDS_HISTORY_DIR", "")
+os.environ.setdefault("SNAPSHOT_PERSIST_DIR", "")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from feed_fixtures import load_feed  # noqa: E402
+from app import iter_json_array  # noqa: E402
+
+# Corps difficiles : chaque nombre, échappement ou caractère multi-octets finit par tomber sur une frontière
+TRICKY = [
+    b'{"Value": []}',
+    b'{"Value":[1]}',
+    b'{"Success": true, "Value": [0, -0, 7, -12, 1.5, -1.5e10, 2E-3, 123456789012345678901234567890, 0.1e+5], "Error": ""}',
+    b'{"Error": {"a": [1, {"b": "]}"}]}, "Count": 3.25, "Value": [{"I": 1, "C": 1.399}, {"I": 2, "C": 30}], "Tail": [1, 2]}',
+    '{"Value": ["é", "Équipe 1 – Ñandú", "日本語", "🙂🙂", "\\u00e9\\ud83d\\ude42", "a\\"b\\\\c\\n", ""]}'.encode(),
+    b'  {  "Value"  :  [  {  "E" : [ { "G" : 1 , "T" : 3 , "C" : 2.5 } ] } ,  null , true , false , "x" , [ ] , { } ]  }  ',
+    b'{"Other": "Value", "Value": [[1, [2, [3]]], {"Value": [4]}]}',
+]
+# Corps invalides : le décodage doit échouer (ValueError) et non produire un résultat partiel silencieux
+INVALID = [
+    b'',
+    b'[1, 2]',
+    b'{"Value": [1, 2',
+    b'{"Value": [1 2]}',
+    b'{"Value": [1.]}',
+]
+
+
+def split(body: bytes, size: int) -> Iterator[bytes]:
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def split_random(body: bytes, rng: random.Random) -> Iterator[bytes]:
+    start = 0
+    while start < len(body):
+        end = start + rng.randint(1, 64)
+        yield body[start:end]
+        start = end
+
+
+def check_identical(bodies: List[bytes], seed: int = 42) -> int:
+    rng = random.Random(seed)
+    checked = 0
+    for body in bodies:
+        expected = json.loads(body)["Value"]
+        for size in (1, 2, 3, 7, len(body) or 1):
+            got = list(iter_json_array(split(body, size)))
+            assert got == expected, (size, body[:80])
+            checked += 1
+        for _ in range(5):
+            assert list(iter_json_array(split_random(body, rng))) == expected, body[:80]
+            checked += 1
+    for body in INVALID:
+        for size in (1, 3, len(body) or 1):
+            try:
+                list(iter_json_array(split(body, size)))
+            except ValueError:
+                checked += 1
+            else:
+                raise AssertionError(f"corps invalide accepté ({size} octets par morceau) : {body!r}")
+    return checked
+
+
+def measure(func, repeat: int) -> float:
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - started)
+    return min(runs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=2000, help="matchs du flux de référence mesurés")
+    parser.add_argument("--chunks", default="1024,16384,65536", help="tailles de morceau mesurées, séparées par des virgules")
+    parser.add_argument("--repeat", type=int, default=5, help="mesures par point (minimum retenu)")
+    args = parser.parse_args()
+
+    feed = json.dumps(load_feed(50), ensure_ascii=False).encode()
+    print(f"{check_identical(TRICKY + [feed])} découpages identiques")
+
+    body = json.dumps(load_feed(args.size), ensure_ascii=False).encode()
+    megabytes = len(body) / 1e6
+    whole = measure(lambda: json.loads(body)["Value"], args.repeat)
+    print(f"{args.size} matchs, {megabytes:.1f} Mo")
+    print(f"{'json.loads':<22} {whole * 1e3:8.1f} ms {megabytes / whole:8.1f} Mo/s")
+    for size in (int(chunk) for chunk in args.chunks.split(",") if chunk):
+        elapsed = measure(lambda: list(iter_json_array(split(body, size))), args.repeat)
+        print(f"{f'morceaux de {size} o':<22} {elapsed * 1e3:8.1f} ms {megabytes / elapsed:8.1f} Mo/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Micro-benchmark de traduire_pari : table compilée contre l'ancienne chaîne de if.
+
+Vérifie d'abord que les libellés sont identiques pour toutes les paires (G, T) connues et
+inconnues, puis mesure le coût par cote.
+
+    python benchmarks/bench_traduire.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import traduire_pari  # noqa: E402
+
+
+# Implémentation d'origine, conservée comme référence
+def traduire_pari_reference(groupe, t, param, team1, team2):
+    def param_str(p):
+        if p in [None, -1.0, ""]:
+            return None
+        try:
+            return str(float(p)).rstrip('0').rstrip('.') if '.' in str(p) else str(p)
+        except:
+            return str(p)
+    # Paris principaux 1X2 virtuels
+    if groupe == 1:
+        if t == 1:
+            return f"Victoire FIFA {team1} (virtuel)"
+        elif t == 2:
+            return f"Victoire FIFA {team2} (virtuel)"
+        elif t == 3:
+            return "Match nul (virtuel)"
+        elif t == 4:
+            return f"Double chance virtuel : {team1} ou Nul"
+        elif t == 5:
+            return f"Double chance virtuel : {team2} ou Nul"
+        elif t == 6:
+            return f"Double chance virtuel : {team1} ou {team2}"
+    # Double chance virtuel (groupe 8, T=4 ou 6)
+    if groupe == 8:
+        if t == 4:
+            return f"Double chance virtuel : {team1} ou Nul"
+        elif t == 6:
+            return f"Double chance virtuel : {team1} ou {team2}"
+    # Over/Under, Handicap, etc. virtuels
+    if groupe in [2, 8, 15, 62]:
+        if t == 7:
+            p = param_str(param)
+            return f"Plus de {p if p else '?'} buts (simulation)"
+        elif t == 8:
+            p = param_str(param)
+            return f"Moins de {p if p else '?'} buts (simulation)"
+        elif t == 9:
+            p = param_str(param)
+            return f"Handicap virtuel {team1} +{p if p else '?'}"
+        elif t == 10:
+            p = param_str(param)
+            return f"Handicap virtuel {team2} -{p if p else '?'}"
+        elif t == 11:
+            return f"Les deux équipes marquent (virtuel) : Oui"
+        elif t == 12:
+            return f"Les deux équipes marquent (virtuel) : Non"
+        elif t == 13 or t == 14:
+            p = param_str(param)
+            return f"Handicap asiatique virtuel {p if p else '?'}"
+    # Score exact virtuel
+    if groupe == 4:
+        p = param_str(param)
+        return f"Score exact virtuel : {p if p else '?'}"
+    # Mi-temps/fin de match virtuel
+    if groupe == 5:
+        if t == 16:
+            return f"{team1} mène à la mi-temps et gagne (virtuel)"
+        elif t == 17:
+            return f"{team2} mène à la mi-temps et gagne (virtuel)"
+        elif t == 18:
+            return f"Nul à la mi-temps, {team1} gagne (virtuel)"
+        elif t == 19:
+            return f"Nul à la mi-temps, {team2} gagne (virtuel)"
+    # Groupes spéciaux virtuels
+    if groupe == 17:
+        if t == 9:
+            p = param_str(param)
+            return f"Handicap virtuel {team1} +{p if p else '?'}"
+        elif t == 10:
+            p = param_str(param)
+            return f"Handicap virtuel {team2} -{p if p else '?'}"
+    if groupe == 19:
+        if t == 180:
+            return f"Pari spécial virtuel (T=180, G=19)"
+        elif t == 181:
+            return f"Pari spécial virtuel (T=181, G=19)"
+    # Cas générique pour tout type inconnu
+    return f"Pari virtuel non reconnu (T={t}, G={groupe})"
+
+
+PARAMS = [None, -1.0, -1, "", 0, 0.0, 1, 1.0, 1.5, -1.5, 2.25, 2.50, 10, "2-1", "1.50", "abc.d", ".5", True]
+GROUPS = [None, True, 0, 1, 1.0, 2, 3, 4, 5, 8, 15, 17, 19, 62, 99, "1"]
+TYPES = [None, True, *range(0, 22), 180, 181, 182, 7.0, "7"]
+
+
+def check_identical() -> int:
+    checked = 0
+    for groupe in GROUPS:
+        for t in TYPES:
+            for param in PARAMS:
+                expected = traduire_pari_reference(groupe, t, param, "Équipe A", "Équipe B")
+                got = traduire_pari(groupe, t, param, "Équipe A", "Équipe B")
+                assert got == expected, (groupe, t, param, got, expected)
+                checked += 1
+    return checked
+
+
+def sample_odds(n: int, seed: int = 42) -> list:
+    # Répartition proche d'un flux réel : surtout 1X2, totaux et handicaps, quelques types inconnus
+    rng = random.Random(seed)
+    pairs = [(1, 1), (1, 2), (1, 3), (8, 4), (8, 6), (17, 9), (17, 10), (2, 7), (2, 8), (15, 11),
+             (62, 13), (4, 5), (5, 16), (19, 180), (99, 1)]
+    return [(*rng.choice(pairs), rng.choice([None, -1.0, 1.5, 2.5, 3.5, -1.5, "2-1"])) for _ in range(n)]
+
+
+def bench(func, odds, repeat: int = 5) -> float:
+    def run():
+        for groupe, t, param in odds:
+            func(groupe, t, param, "Équipe A", "Équipe B")
+    return min(timeit.repeat(run, number=1, repeat=repeat)) / len(odds)
+
+
+def main() -> None:
+    print(f"{check_identical()} combinaisons (G, T, P) identiques")
+    odds = sample_odds(50_000)
+    before = bench(traduire_pari_reference, odds)
+    after = bench(traduire_pari, odds)
+    print(f"chaîne de if     : {before * 1e9:8.0f} ns/cote")
+    print(f"table compilée   : {after * 1e9:8.0f} ns/cote")
+    print(f"gain             : x{before / after:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Flux Get1x2_VZip de référence pour les benchmarks, utilisables hors ligne.
+
+Le flux de base (feeds/feed_50.json) contient 50 matchs au format du flux réel ; les tailles
+supérieures sont obtenues par mise à l'échelle synthétique (copies avec identifiants, équipes
+et cotes décalés), de façon déterministe.
+
+    python benchmarks/feed_fixtures.py record [URL]   # capture anonymisée du flux réel
+    python benchmarks/feed_fixtures.py synthetic      # régénère le flux de base synthétique
+"""
+import copy
+import json
+import os
+import random
+import sys
+from typing import Any, Dict, List
+
+FEEDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "feeds")
+BASE_FIXTURE = os.path.join(FEEDS_DIR, "feed_50.json")
+
+# Champs lus par app.py ; le reste (identifiants d'équipes, images, liens) est retiré à l'anonymisation
+KEPT_FIELDS = ("I", "LE", "O1", "O2", "CN", "CE", "SN", "SE", "S", "T", "E", "AE", "MIS", "SC", "TN", "TNS")
+
+LEAGUES = [
+    "FIFA 23. Ligue virtuelle", "FIFA 23. Coupe virtuelle", "NBA 2K23. Cyber League", "IPBL Pro Division",
+    "Hockey virtuel. NHL", "ATP virtuel", "WTA virtuel", "TBL Table Basketball", "Cricket sim. T20",
+]
+
+
+def anonymize(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Remplace les noms d'équipes par « Équipe N » (même nom, même numéro) et ne garde que les champs utiles."""
+    teams: Dict[str, str] = {}
+
+    def team(name: Any) -> Any:
+        if not isinstance(name, str):
+            return name
+        if name not in teams:
+            teams[name] = f"Équipe {len(teams) + 1}"
+        return teams[name]
+
+    matches = []
+    for match in payload.get("Value", []):
+        match = {key: copy.deepcopy(match[key]) for key in KEPT_FIELDS if key in match}
+        for key in ("O1", "O2"):
+            if key in match:
+                match[key] = team(match[key])
+        matches.append(match)
+    return {"Error": "", "Success": True, "Value": matches}
+
+
+def synthetic_feed(n: int, seed: int = 85) -> Dict[str, Any]:
+    """Flux synthétique au format réel : matchs à venir, en cours et terminés, cotes principales et alternatives."""
+    rng = random.Random(seed)
+
+    def price(low: float = 1.15, high: float = 6.0) -> float:
+        return round(rng.uniform(low, high), 3)
+
+    matches = []
+    for i in range(n):
+        phase = rng.random()
+        sc: Dict[str, Any] = {"ST": [{"Value": [
+            {"N": "Tirs", "S1": str(rng.randint(0, 12)), "S2": str(rng.randint(0, 12))},
+            {"N": "Possession", "S1": str(rng.randint(35, 65)), "S2": str(rng.randint(35, 65))},
+        ]}]}
+        match: Dict[str, Any] = {
+            "I": 500_000_000 + i * 7,
+            "LE": rng.choice(LEAGUES),
+            "O1": f"Équipe {2 * i + 1}",
+            "O2": f"Équipe {2 * i + 2}",
+            "CN": "Monde",
+            "CE": "Virtuel",
+            "SN": "FIFA",
+            "S": 1_700_000_000 + i * 180,
+            "MIS": [{"K": 9, "V": str(rng.randint(5, 30))}, {"K": 27, "V": str(rng.randint(30, 90))}],
+            "SC": sc,
+        }
+        if phase < 0.45:
+            sc["TS"] = rng.randint(60, 5400)
+            sc["FS"] = {"S1": rng.randint(0, 4), "S2": rng.randint(0, 4)}
+        elif phase < 0.6:
+            sc["FS"] = {"S1": rng.randint(0, 4), "S2": rng.randint(0, 4)}
+            sc["TT"] = 3
+            match["TN"] = "Match terminé"
+        match["E"] = [{"G": 1, "T": t, "C": price()} for t in (1, 2, 3)]
+        match["E"] += [{"G": 8, "T": 4, "C": price(1.05, 2)}, {"G": 8, "T": 6, "C": price(1.05, 2)}]
+        line = rng.choice([1.5, 2.5, 3.5])
+        match["E"] += [{"G": 17, "T": 9, "P": line, "C": price(1.3, 3)}, {"G": 17, "T": 10, "P": line, "C": price(1.3, 3)}]
+        alternatives = []
+        for groupe, types in ((2, (7, 8)), (62, (13, 14)), (17, (9, 10))):
+            rows = []
+            for p in rng.sample([0.5, 1.5, 2.5, 3.5, 4.5, 5.5], rng.randint(1, 4)):
+                for t in types:
+                    rows.append({"G": groupe, "T": t, "P": p if t != 8 else -p, "C": price(1.2, 4.5)})
+            alternatives.append({"G": groupe, "ME": rows})
+        alternatives.append({"G": 15, "ME": [{"G": 15, "T": 11, "C": price(1.4, 2.6)}, {"G": 15, "T": 12, "C": price(1.4, 2.6)}]})
+        if rng.random() < 0.3:
+            alternatives.append({"G": 19, "ME": [{"T": 180, "C": price()}, {"T": 181, "C": price()}]})
+        match["AE"] = alternatives
+        matches.append(match)
+    return {"Error": "", "Success": True, "Value": matches}
+
+
+def scale(payload: Dict[str, Any], n: int, seed: int = 0) -> Dict[str, Any]:
+    """Étend (ou tronque) le flux à n matchs : chaque copie reçoit un nouvel identifiant, de nouvelles équipes et des cotes décalées."""
+    base = payload["Value"]
+    if not base:
+        raise ValueError("flux de base vide")
+    rng = random.Random(seed)
+    matches = []
+    for i in range(n):
+        round_, source = divmod(i, len(base))
+        match = copy.deepcopy(base[source])
+        if round_:
+            match["I"] = match.get("I", 0) + round_ * 10_000_000
+            for key in ("O1", "O2"):
+                if isinstance(match.get(key), str):
+                    match[key] = f"{match[key]} #{round_}"
+            factor = rng.uniform(0.97, 1.03)
+            for o in match.get("E", []) + [o for ae in match.get("AE", []) for o in ae.get("ME", [])]:
+                if isinstance(o.get("C"), (int, float)):
+                    o["C"] = round(max(1.01, o["C"] * factor), 3)
+        matches.append(match)
+    return {**payload, "Value": matches}
+
+
+def load_feed(n: int) -> Dict[str, Any]:
+    """Flux de n matchs construit à partir du flux de base (synthétique s'il n'a pas été enregistré)."""
+    if os.path.exists(BASE_FIXTURE):
+        with open(BASE_FIXTURE, encoding="utf-8") as f:
+            base = json.load(f)
+    else:
+        base = synthetic_feed(50)
+    return scale(base, n)
+
+
+def save(payload: Dict[str, Any], path: str = BASE_FIXTURE) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        f.write("\n")
+    print(f"{len(payload['Value'])} matchs enregistrés dans {path}")
+
+
+def main(argv: List[str]) -> None:
+    command = argv[1] if len(argv) > 1 else ""
+    if command == "record":
+        import requests
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from app import FEED_URL
+        response = requests.get(argv[2] if len(argv) > 2 else FEED_URL, timeout=30)
+        response.raise_for_status()
+        save(anonymize(response.json()))
+    elif command == "synthetic":
+        save(synthetic_feed(50))
+    else:
+        print(__doc__)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,328 @@
+"""Faux flux 1xbet local pour les tests de charge hors ligne : enregistrement, rejeu et flux synthétique.
+
+Le simulateur sert Get1x2_VZip (liste des matchs) et GetGameZip?id= (un match) avec une latence,
+une taille de flux, un renouvellement des matchs et des erreurs réglables ; l'application y est
+branchée par ses variables d'environnement :
+
+    FEED_URL=http://127.0.0.1:8085/LiveFeed/Get1x2_VZip
+    FEED_GAME_URL=http://127.0.0.1:8085/LiveFeed/GetGameZip?id={id}
+
+    python benchmarks/feed_simulator.py record --interval 20 --count 90        # capture du flux réel
+    python benchmarks/feed_simulator.py replay data/feed_recordings --tick 20
+    python benchmarks/feed_simulator.py synthetic --size 500 --churn 0.1 --tick 2 --latency 0.08 --error-rate 0.02
+
+GET /__stats renvoie les compteurs du simulateur (requêtes, erreurs injectées, octets envoyés).
+"""
+import abc
+import argparse
+import copy
+import glob
+import gzip
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from feed_fixtures import anonymize, scale, synthetic_feed  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECORDINGS_DIR = os.path.join(ROOT, "data", "feed_recordings")
+ERROR_KINDS = ("503", "timeout", "truncated", "invalid")
+
+
+# --- Sources des flux servis ---
+class Frames(abc.ABC):
+    """Flux courant, encodé une fois (JSON et gzip) et remplacé toutes les `tick` secondes."""
+
+    def __init__(self, tick: float):
+        self.tick = tick
+        self.index = 0
+        self._lock = threading.Lock()
+        self._payload: Dict[str, Any] = {"Value": []}
+        self._by_id: Dict[Any, dict] = {}
+        self._bodies: Tuple[bytes, bytes] = (b"", b"")
+
+    def publish(self, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+        by_id = {match.get("I"): match for match in payload.get("Value", [])}
+        with self._lock:
+            self._payload = payload
+            self._by_id = by_id
+            self._bodies = (body, gzip.compress(body, compresslevel=5))
+            self.index += 1
+
+    def feed(self, compressed: bool) -> bytes:
+        with self._lock:
+            return self._bodies[1 if compressed else 0]
+
+    def game(self, match_id: int) -> Optional[dict]:
+        with self._lock:
+            return self._by_id.get(match_id)
+
+    @abc.abstractmethod
+    def advance(self) -> None:
+        """Passe à l'image suivante du flux (appelé toutes les `tick` secondes)."""
+
+    def run(self) -> None:
+        while True:
+            time.sleep(self.tick)
+            self.advance()
+
+
+class ReplayFrames(Frames):
+    """Rejoue en boucle des réponses enregistrées (fichiers .json ou .json.gz, dans l'ordre des noms)."""
+
+    def __init__(self, directory: str, tick: float, size: Optional[int]):
+        super().__init__(tick)
+        paths = sorted(glob.glob(os.path.join(directory, "*.json")) + glob.glob(os.path.join(directory, "*.json.gz")))
+        if not paths:
+            raise SystemExit(f"aucun flux enregistré dans {directory}")
+        self.frames = []
+        for path in paths:
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, "rt", encoding="utf-8") as f:
+                payload = json.load(f)
+            self.frames.append(scale(payload, size) if size else payload)
+        self.position = 0
+        self.publish(self.frames[0])
+
+    def advance(self) -> None:
+        self.position = (self.position + 1) % len(self.frames)
+        self.publish(self.frames[self.position])
+
+
+class SyntheticFrames(Frames):
+    """Flux synthétique qui évolue à chaque tick : scores et cotes d'une fraction `churn` des matchs,
+    et remplacement d'une fraction `turnover` des matchs par de nouveaux (identifiants inédits)."""
+
+    def __init__(self, size: int, tick: float, churn: float, turnover: float, seed: int):
+        super().__init__(tick)
+        self.churn = churn
+        self.turnover = turnover
+        self.rng = random.Random(seed)
+        self.template = synthetic_feed(max(size, 1), seed)["Value"]
+        self.matches = copy.deepcopy(self.template)
+        self.next_id = max(match["I"] for match in self.matches) + 7
+        self.publish({"Error": "", "Success": True, "Value": self.matches})
+
+    def advance(self) -> None:
+        matches = [copy.copy(match) for match in self.matches]
+        count = len(matches)
+        for i in self.rng.sample(range(count), round(count * self.churn)):
+            match = matches[i]
+            sc = copy.deepcopy(match.get("SC", {}))
+            if "TS" in sc:
+                sc["TS"] += int(self.tick)
+                score = sc.setdefault("FS", {})
+                key = self.rng.choice(("S1", "S2"))
+                if self.rng.random() < 0.3:
+                    score[key] = score.get(key, 0) + 1
+            match["SC"] = sc
+            match["E"] = [dict(o, C=round(max(1.01, o["C"] * self.rng.uniform(0.95, 1.05)), 3)) for o in match.get("E", [])]
+        for i in self.rng.sample(range(count), round(count * self.turnover)):
+            match = copy.deepcopy(self.rng.choice(self.template))
+            match["I"] = self.next_id
+            self.next_id += 7
+            matches[i] = match
+        self.matches = matches
+        self.publish({"Error": "", "Success": True, "Value": matches})
+
+
+# --- Serveur ---
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.bytes = 0
+
+    def count(self, path: str, error: Optional[str] = None, size: int = 0) -> None:
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            if error:
+                self.errors[error] = self.errors.get(error, 0) + 1
+            self.bytes += size
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self.lock:
+            return {"requests": dict(self.requests), "errors": dict(self.errors), "bytes": self.bytes}
+
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    frames: Frames
+    stats: Stats
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+    errors: Tuple[str, ...] = ERROR_KINDS
+    hang = 30.0
+    rng = random.Random()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/").rsplit("/", 1)[-1]
+        if path == "__stats":
+            return self.send_body(200, json.dumps(dict(self.stats.to_dict(), frame=self.frames.index)).encode())
+        if path == "GetGameZip":
+            try:
+                match = self.frames.game(int(parse_qs(url.query)["id"][0]))
+            except (KeyError, ValueError):
+                match = None
+            body = json.dumps({"Error": "", "Success": match is not None, "Value": match}, ensure_ascii=False).encode()
+            compressed = False
+        elif path == "Get1x2_VZip":
+            compressed = "gzip" in self.headers.get("Accept-Encoding", "")
+            body = self.frames.feed(compressed)
+        else:
+            self.stats.count(path, "404")
+            return self.send_body(404, b'{"Error":"not found"}')
+        time.sleep(max(0.0, self.rng.gauss(self.latency, self.jitter)))
+        if self.error_rate and self.rng.random() < self.error_rate:
+            return self.inject(path, self.rng.choice(self.errors), body, compressed)
+        self.stats.count(path, size=len(body))
+        self.send_body(200, body, compressed)
+
+    def inject(self, path: str, kind: str, body: bytes, compressed: bool) -> None:
+        self.stats.count(path, kind)
+        if kind == "503":
+            self.send_body(503, b'{"Error":"Service Unavailable"}')
+        elif kind == "timeout":
+            # Plus long que le délai de lecture du client, qui abandonne la requête
+            time.sleep(self.hang)
+            self.close_connection = True
+        elif kind == "truncated":
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            if compressed:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+        else:
+            self.send_body(200, b'{"Error":"","Success":true,"Value":[{"I":')
+
+    def send_body(self, status: int, body: bytes, compressed: bool = False) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if compressed:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_simulator(frames: Frames, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                    error_rate: float = 0.0, errors: Tuple[str, ...] = ERROR_KINDS, hang: float = 30.0,
+                    seed: Optional[int] = None) -> Tuple[ThreadingHTTPServer, Stats]:
+    """Démarre le simulateur dans des threads de fond ; renvoie le serveur (server_port) et ses compteurs."""
+    stats = Stats()
+    handler = type("Handler", (SimulatorHandler,), {
+        "frames": frames, "stats": stats, "latency": latency, "jitter": jitter, "error_rate": error_rate,
+        "errors": errors, "hang": hang, "rng": random.Random(seed),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="feed-simulator", daemon=True).start()
+    if frames.tick > 0:
+        threading.Thread(target=frames.run, name="feed-simulator-tick", daemon=True).start()
+    return server, stats
+
+
+# --- Enregistrement ---
+def record(url: str, output: str, interval: float, count: int, keep_names: bool) -> None:
+    """Capture `count` réponses du flux réel, une toutes les `interval` secondes (une seule requête à la fois)."""
+    import requests
+    os.makedirs(output, exist_ok=True)
+    session = requests.Session()
+    for i in range(count):
+        started = time.monotonic()
+        try:
+            response = session.get(url, timeout=30)
+            response.raise_for_status()
+            payload = response.json()
+            if not keep_names:
+                payload = anonymize(payload)
+            path = os.path.join(output, f"{int(time.time())}-{i:05d}.json.gz")
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+            print(f"{path} : {len(payload.get('Value', []))} matchs", flush=True)
+        except Exception as e:
+            print(f"Erreur lors de l'enregistrement du flux: {e}", flush=True)
+        if i + 1 < count:
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--tick", type=float, default=20, help="secondes entre deux états du flux (0 : flux figé)")
+    parser.add_argument("--latency", type=float, default=0.05, help="latence moyenne ajoutée à chaque réponse, en secondes")
+    parser.add_argument("--jitter", type=float, default=0.0, help="écart type de la latence, en secondes")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction des réponses remplacées par une erreur")
+    parser.add_argument("--errors", default=",".join(ERROR_KINDS), help="erreurs injectées : " + ", ".join(ERROR_KINDS))
+    parser.add_argument("--hang", type=float, default=30.0, help="durée d'une erreur « timeout », en secondes")
+    parser.add_argument("--seed", type=int, default=85)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    recorder = commands.add_parser("record", help="enregistre des réponses du flux réel")
+    recorder.add_argument("--url", help="URL du flux (par défaut FEED_URL de app.py)")
+    recorder.add_argument("--output", default=RECORDINGS_DIR)
+    recorder.add_argument("--interval", type=float, default=20, help="secondes entre deux captures")
+    recorder.add_argument("--count", type=int, default=30, help="nombre de captures")
+    recorder.add_argument("--keep-names", action="store_true", help="ne pas anonymiser les équipes")
+
+    replay = commands.add_parser("replay", help="rejoue des réponses enregistrées")
+    replay.add_argument("directory", nargs="?", default=RECORDINGS_DIR)
+    replay.add_argument("--size", type=int, help="nombre de matchs (mise à l'échelle des réponses enregistrées)")
+    add_server_arguments(replay)
+
+    synthetic = commands.add_parser("synthetic", help="sert un flux synthétique qui évolue")
+    synthetic.add_argument("--size", type=int, default=50, help="nombre de matchs")
+    synthetic.add_argument("--churn", type=float, default=0.1, help="fraction des matchs modifiés à chaque tick")
+    synthetic.add_argument("--turnover", type=float, default=0.02, help="fraction des matchs remplacés à chaque tick")
+    add_server_arguments(synthetic)
+
+    args = parser.parse_args()
+    if args.command == "record":
+        url = args.url
+        if not url:
+            sys.path.insert(0, ROOT)
+            from app import FEED_URL
+            url = FEED_URL
+        record(url, args.output, args.interval, args.count, args.keep_names)
+        return
+    if args.command == "replay":
+        frames: Frames = ReplayFrames(args.directory, args.tick, args.size)
+    else:
+        frames = SyntheticFrames(args.size, args.tick, args.churn, args.turnover, args.seed)
+    errors = tuple(kind for kind in args.errors.split(",") if kind in ERROR_KINDS)
+    server, _ = start_simulator(frames, args.host, args.port, args.latency, args.jitter, args.error_rate, errors,
+                                args.hang, args.seed)
+    base = f"http://{args.host}:{server.server_port}/LiveFeed"
+    print(f"FEED_URL={base}/Get1x2_VZip")
+    print(f"FEED_GAME_URL={base}/GetGameZip?id={{id}}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
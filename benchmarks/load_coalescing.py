@@ -0,0 +1,141 @@
+"""Test de charge des récupérations partagées (single-flight), hors ligne.
+
+Un faux flux amont local (latence réglable) compte les requêtes reçues ; l'application tourne en mode
+à la demande (FEED_ON_DEMAND) et N clients concurrents interrogent /api/matches en boucle. Quelle que
+soit la concurrence, le flux amont ne doit être appelé qu'une fois par intervalle de rafraîchissement
+(code de sortie 1 sinon).
+
+    python benchmarks/load_coalescing.py
+    python benchmarks/load_coalescing.py --concurrency 1,50,200 --duration 5 --interval 0.5 --latency 0.2
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from feed_fixtures import load_feed  # noqa: E402
+
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    body = b""
+    latency = 0.0
+    hits = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with UpstreamHandler.lock:
+            UpstreamHandler.hits += 1
+        time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_upstream(size: int, latency: float) -> ThreadingHTTPServer:
+    UpstreamHandler.body = json.dumps(load_feed(size)).encode()
+    UpstreamHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), UpstreamHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_level(app_module: Any, concurrency: int, duration: float) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+    start = threading.Barrier(concurrency)
+
+    def client():
+        http = app_module.app.test_client()
+        local: List[float] = []
+        failed = 0
+        start.wait()
+        while time.monotonic() < stop_at:
+            begin = time.perf_counter()
+            response = http.get("/api/matches")
+            response.get_data()
+            local.append(time.perf_counter() - begin)
+            if response.status_code != 200:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    before = UpstreamHandler.hits
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "upstream": UpstreamHandler.hits - before,
+        "p50_ms": statistics.median(latencies) * 1e3 if latencies else 0.0,
+        "p99_ms": percentile(latencies, 0.99) * 1e3 if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,10,50,200", help="clients concurrents, séparés par des virgules")
+    parser.add_argument("--duration", type=float, default=3.0, help="durée de chaque palier, en secondes")
+    parser.add_argument("--interval", type=float, default=0.5, help="intervalle de rafraîchissement du flux, en secondes")
+    parser.add_argument("--latency", type=float, default=0.1, help="latence du faux flux amont, en secondes")
+    parser.add_argument("--size", type=int, default=500, help="nombre de matchs du flux")
+    args = parser.parse_args()
+
+    upstream = start_upstream(args.size, args.latency)
+    os.environ.update({
+        "FEED_URL": f"http://127.0.0.1:{upstream.server_port}/LiveFeed/Get1x2_VZip",
+        "FEED_ON_DEMAND": "1",
+        "FEED_POLLER_ENABLED": "0",
+        "FEED_REFRESH_INTERVAL": str(args.interval),
+        "ODDS_HISTORY_DIR": "",
+        "SHARED_SNAPSHOT_DIR": "",
+        "SNAPSHOT_PERSIST_DIR": "",
+    })
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import app  # noqa: E402
+
+    print(f"{'clients':>8} {'requêtes':>9} {'erreurs':>8} {'amont':>6} {'fenêtres':>9} {'p50':>9} {'p99':>9}")
+    failures = 0
+    for concurrency in (int(level) for level in args.concurrency.split(",") if level):
+        # Chaque palier part d'un snapshot périmé
+        app.feed._refresh_due = 0.0
+        result = run_level(app, concurrency, args.duration)
+        # Une récupération au départ puis au plus une par intervalle écoulé
+        windows = math.ceil(args.duration / args.interval) + 1
+        flag = ""
+        if result["upstream"] > windows or result["errors"]:
+            flag = "  ÉCHEC"
+            failures += 1
+        print(f"{concurrency:>8} {result['requests']:>9} {result['errors']:>8} {result['upstream']:>6} {windows:>9} "
+              f"{result['p50_ms']:>7.2f}ms {result['p99_ms']:>7.2f}ms{flag}", flush=True)
+    upstream.shutdown()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Test de charge HTTP de toutes les routes, contre le simulateur de flux (aucun appel à 1xbet.com).
+
+Sans --target, lance le simulateur synthétique et l'application sous gunicorn (sous-processus) ;
+chaque route est ensuite chargée tour à tour par N clients en boucle fermée pendant --duration
+secondes. Rapport : requêtes, erreurs, débit, latences p50 / p99 / max.
+
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --size 500 --concurrency 32 --duration 10 --workers 4 --output charge.json
+    python benchmarks/load_test.py --target http://127.0.0.1:8000 --routes api_matches,home
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from feed_simulator import ERROR_KINDS, SyntheticFrames, start_simulator  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app(feed_port: int, workers: int, threads: int, env: Dict[str, str]) -> subprocess.Popen:
+    port = free_port()
+    base = f"http://127.0.0.1:{feed_port}/LiveFeed"
+    environment = dict(os.environ, FEED_URL=f"{base}/Get1x2_VZip", FEED_GAME_URL=f"{base}/GetGameZip?id={{id}}",
+                       ODDS_HISTORY_DIR=tempfile.mkdtemp(prefix="load-history-"), SNAPSHOT_PERSIST_DIR="",
+                       SHARED_SNAPSHOT_DIR=tempfile.mkdtemp(prefix="load-shared-") if workers > 1 else "")
+    environment.update(env)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--workers", str(workers), "--threads", str(threads),
+         "--bind", f"127.0.0.1:{port}", "--log-level", "warning", "app:app"],
+        cwd=ROOT, env=environment,
+    )
+    process.base_url = f"http://127.0.0.1:{port}"
+    return process
+
+
+def wait_ready(base_url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base_url}/api/matches", timeout=5).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"{base_url} ne répond pas après {timeout:.0f} s")
+
+
+def discover_routes(base_url: str) -> Dict[str, str]:
+    matches = requests.get(f"{base_url}/api/matches", timeout=10).json()["data"]
+    match = next((m for m in matches if m.get("id") is not None), None)
+    routes = {
+        "home": "/",
+        "home_filtered": "/?status=live&page=1",
+        "api_matches": "/api/matches",
+        "api_matches_filtered": "/api/matches?status=live&page=1",
+        "api_analytics": "/api/analytics",
+        "metrics": "/metrics",
+    }
+    if match is not None:
+        word = (match.get("team1") or "a").split()[0]
+        routes.update({
+            "api_search": f"/api/search?q={word}",
+            "api_match": f"/api/match/{match['id']}",
+            "api_match_history": f"/api/match/{match['id']}/history",
+            "match_page": f"/match/{match['id']}",
+        })
+    return routes
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def load_route(url: str, concurrency: int, duration: float, compressed: bool) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+    state = {"stop_at": 0.0}
+
+    def client():
+        session = requests.Session()
+        if not compressed:
+            session.headers["Accept-Encoding"] = "identity"
+        local: List[float] = []
+        codes: Dict[str, int] = {}
+        barrier.wait()
+        while time.perf_counter() < state["stop_at"]:
+            started = time.perf_counter()
+            try:
+                response = session.get(url, timeout=30)
+                response.content
+                code = str(response.status_code)
+            except requests.RequestException as e:
+                code = type(e).__name__
+            local.append(time.perf_counter() - started)
+            codes[code] = codes.get(code, 0) + 1
+        with lock:
+            latencies.extend(local)
+            for code, count in codes.items():
+                statuses[code] = statuses.get(code, 0) + count
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    started = time.perf_counter()
+    state["stop_at"] = started + duration
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    ordered = sorted(latencies)
+    errors = sum(count for code, count in statuses.items() if not code.startswith(("2", "3")))
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "statuses": statuses,
+        "rps": len(ordered) / elapsed,
+        "p50_ms": statistics.median(ordered) * 1e3 if ordered else 0.0,
+        "p99_ms": percentile(ordered, 0.99) * 1e3 if ordered else 0.0,
+        "max_ms": ordered[-1] * 1e3 if ordered else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", help="URL d'une application déjà lancée (sinon : simulateur + gunicorn locaux)")
+    parser.add_argument("--routes", help="routes à charger, séparées par des virgules (par défaut : toutes)")
+    parser.add_argument("--concurrency", type=int, default=16, help="clients simultanés")
+    parser.add_argument("--duration", type=float, default=5.0, help="durée de charge de chaque route, en secondes")
+    parser.add_argument("--identity", action="store_true", help="refuser la compression gzip des réponses")
+    parser.add_argument("--output", help="fichier JSON où écrire les résultats")
+    local = parser.add_argument_group("application et simulateur locaux")
+    local.add_argument("--workers", type=int, default=2, help="workers gunicorn")
+    local.add_argument("--threads", type=int, default=8, help="threads par worker gunicorn")
+    local.add_argument("--size", type=int, default=50, help="matchs du flux simulé")
+    local.add_argument("--tick", type=float, default=5, help="secondes entre deux états du flux simulé")
+    local.add_argument("--churn", type=float, default=0.1, help="fraction des matchs modifiés à chaque tick")
+    local.add_argument("--latency", type=float, default=0.05, help="latence du flux simulé, en secondes")
+    local.add_argument("--error-rate", type=float, default=0.0, help="fraction des réponses du flux en erreur")
+    local.add_argument("--refresh", type=float, default=5, help="FEED_REFRESH_INTERVAL de l'application")
+    args = parser.parse_args()
+
+    process: Optional[subprocess.Popen] = None
+    simulator = None
+    try:
+        if args.target:
+            base_url = args.target.rstrip("/")
+        else:
+            frames = SyntheticFrames(args.size, args.tick, args.churn, 0.02, 85)
+            simulator, stats = start_simulator(frames, latency=args.latency, jitter=args.latency / 4,
+                                               error_rate=args.error_rate, errors=ERROR_KINDS, hang=15.0)
+            process = start_app(simulator.server_port, args.workers, args.threads,
+                                {"FEED_REFRESH_INTERVAL": str(args.refresh)})
+            base_url = process.base_url
+        wait_ready(base_url, 60)
+        routes = discover_routes(base_url)
+        if args.routes:
+            wanted = args.routes.split(",")
+            routes = {name: path for name, path in routes.items() if name in wanted}
+
+        print(f"{len(routes)} routes, {args.concurrency} clients, {args.duration:.0f} s par route ({base_url})")
+        print(f"{'route':<22} {'requêtes':>9} {'erreurs':>8} {'req/s':>9} {'p50':>10} {'p99':>10} {'max':>10}")
+        results = {}
+        for name, path in routes.items():
+            result = load_route(base_url + path, args.concurrency, args.duration, not args.identity)
+            results[name] = dict(result, path=path)
+            print(f"{name:<22} {result['requests']:>9} {result['errors']:>8} {result['rps']:>9.1f} "
+                  f"{result['p50_ms']:>8.2f}ms {result['p99_ms']:>8.2f}ms {result['max_ms']:>8.2f}ms", flush=True)
+        if simulator is not None:
+            print(f"\nflux simulé : {json.dumps(stats.to_dict(), ensure_ascii=False)}")
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump({"target": base_url, "concurrency": args.concurrency, "duration": args.duration,
+                           "results": results}, f, indent=2)
+                f.write("\n")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(10)
+        if simulator is not None:
+            simulator.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Courbe de montée en charge de l'analyse parallèle (pool de processus) selon le nombre de cœurs, hors ligne.
+
+Pour chaque taille de flux, construit un snapshot à froid (tous les matchs à analyser) en série puis
+avec 2, 4, ... processus (jusqu'au nombre de cœurs disponibles) ; le pool est démarré avant la mesure.
+
+    python benchmarks/parse_scaling.py
+    python benchmarks/parse_scaling.py --sizes 5000,20000 --workers 1,2,4,8 --output scaling.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+os.environ.setdefault("FEED_POLLER_ENABLED", "0")
+os.environ.setdefault("ODDS_HISTORY_DIR", "")
+os.environ.setdefault("SNAPSHOT_PERSIST_DIR", "")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app  # noqa: E402
+from feed_fixtures import load_feed  # noqa: E402
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def default_workers() -> List[int]:
+    cores = available_cores()
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def time_build(matches: List[dict], repeat: int) -> float:
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        app.build_snapshot(matches)
+        runs.append(time.perf_counter() - started)
+    return statistics.median(runs)
+
+
+def run(sizes: List[int], workers: List[int], repeat: int, chunk: int) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    print(f"{'matchs':>7} {'processus':>10} {'durée':>11} {'accélération':>13} {'efficacité':>11}")
+    for size in sizes:
+        matches = load_feed(size)["Value"]
+        serial = None
+        for count in workers:
+            # Pas de seuil : seule la comparaison série / parallèle nous intéresse ici
+            app.parse_pool = app.ParsePool(count, 0, chunk)
+            if app.parse_pool.enabled:
+                app.build_snapshot(matches[:count * 2])
+            median = time_build(matches, repeat)
+            app.parse_pool.shutdown()
+            if serial is None:
+                serial = median
+            speedup = serial / median
+            results[f"parse.build_cold[{size}][{count}]"] = {"median_s": median, "workers": count, "items": size,
+                                                             "speedup": speedup}
+            print(f"{size:>7} {count:>10} {median * 1e3:>9.1f}ms {speedup:>12.2f}x {speedup / count:>10.0%}", flush=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="2000,10000", help="nombres de matchs, séparés par des virgules")
+    parser.add_argument("--workers", default=",".join(map(str, default_workers())),
+                        help="nombres de processus, séparés par des virgules (1 : analyse en série)")
+    parser.add_argument("--repeat", type=int, default=3, help="mesures par point (médiane retenue)")
+    parser.add_argument("--chunk", type=int, default=app.FEED_PARSE_CHUNK, help="taille maximale d'un lot")
+    parser.add_argument("--output", help="fichier JSON où écrire les résultats")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    workers = [int(count) for count in args.workers.split(",") if count]
+    print(f"{available_cores()} cœur(s) disponible(s)")
+    results = run(sizes, workers, args.repeat, args.chunk)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"cores": available_cores(), "results": results}, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Suite de benchmarks : fonctions d'analyse du flux et routes Flask (client de test), hors ligne.
+
+Chaque mesure est répétée et la médiane est retenue ; les résultats peuvent être écrits en JSON
+et comparés à une référence enregistrée (code de sortie 1 en cas de régression).
+
+    python benchmarks/run.py                                   # tailles 50, 500 et 5000
+    python benchmarks/run.py --sizes 50,500 --filter http.
+    python benchmarks/run.py --output avant.json
+    python benchmarks/run.py --compare avant.json --tolerance 0.15
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import timeit
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Pas de poller ni d'historique sur disque : le snapshot est publié à la main
+os.environ.setdefault("FEED_POLLER_ENABLED", "0")
+os.environ.setdefault("ODDS_HISTORY_DIR", "")
+os.environ.setdefault("SNAPSHOT_PERSIST_DIR", "")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np  # noqa: E402
+
+import app  # noqa: E402
+from feed_fixtures import load_feed  # noqa: E402
+
+DEFAULT_SIZES = (50, 500, 5000)
+
+
+def measure(func: Callable[[], Any], repeat: int, min_time: float) -> Tuple[float, float]:
+    """Durée médiane et minimale d'un appel, en secondes (nombre d'appels par mesure choisi automatiquement)."""
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    runs = [elapsed / number] + [t / number for t in timer.repeat(repeat=repeat - 1, number=number)]
+    return statistics.median(runs), min(runs)
+
+
+def function_benchmarks(matches: List[dict]) -> Dict[str, Tuple[Callable[[], Any], int]]:
+    """Fonctions d'analyse : (appel, nombre d'éléments traités par appel)."""
+    odds = [app.extract_odds(match) for match in matches]
+    pairs = list(zip(matches, odds))
+    names = [(match.get("O1", "–"), match.get("O2", "–")) for match in matches]
+    bets = [(o.groups[i], o.types[i], o.params[i], *names[k]) for k, o in enumerate(odds) for i in range(len(o.prices))]
+    snapshot = app.build_snapshot(matches)
+
+    def traduire():
+        for groupe, t, param, team1, team2 in bets:
+            app.traduire_pari(groupe, t, param, team1, team2)
+
+    def all_predictions():
+        for (match, match_odds), (team1, team2) in zip(pairs, names):
+            app.get_all_predictions(match, team1, team2, match_odds)
+
+    def analytics():
+        app.compute_odds_analytics(snapshot)
+
+    index = app.build_search_index(snapshot)
+    queries = [app.search_tokens(match.get("O1", ""))[:1] for match in matches[:50]]
+
+    def search():
+        for tokens in queries:
+            index.search(tokens)
+
+    return {
+        "parse.extract_odds": (lambda: [app.extract_odds(match) for match in matches], len(matches)),
+        "parse.parse_match": (lambda: [app.parse_match(match, o) for match, o in pairs], len(matches)),
+        "parse.parse_match_details": (lambda: [app.parse_match_details(match, o) for match, o in pairs], len(matches)),
+        "parse.get_all_predictions": (all_predictions, len(matches)),
+        "parse.traduire_pari": (traduire, len(bets)),
+        "snapshot.build_cold": (lambda: app.build_snapshot(matches), len(matches)),
+        "snapshot.build_unchanged": (lambda: app.build_snapshot(matches, snapshot), len(matches)),
+        "analytics.compute": (analytics, len(matches)),
+        "search.build_index": (lambda: app.build_search_index(snapshot), len(matches)),
+        "search.query": (search, len(queries)),
+    }
+
+
+def http_benchmarks(matches: List[dict]) -> Dict[str, Tuple[Callable[[], Any], int]]:
+    """Routes complètes via le client de test ; « cold » vide les caches de réponses avant chaque requête."""
+    app.feed.publish(app.build_snapshot(matches))
+    client = app.app.test_client()
+    match_id = matches[len(matches) // 2]["I"]
+
+    def get(path: str, cold: bool) -> Callable[[], Any]:
+        def run():
+            if cold:
+                app.json_cache.clear()
+                app.html_cache.clear()
+                app.analytics_cache.clear()
+                app.search_cache.clear()
+            response = client.get(path)
+            assert response.status_code == 200, (path, response.status_code)
+            response.get_data()
+        return run
+
+    routes = {
+        "home": "/?page=2",
+        "api_matches": "/api/matches?page=2",
+        "api_match": f"/api/match/{match_id}",
+        "match_page": f"/match/{match_id}",
+        "api_analytics": "/api/analytics",
+        "api_search": "/api/search?q=" + "+".join(app.search_tokens(matches[len(matches) // 2].get("O1", "a"))[:1] or ["a"]),
+    }
+    benchmarks = {}
+    for name, path in routes.items():
+        benchmarks[f"http.{name}.cold"] = (get(path, True), 1)
+        benchmarks[f"http.{name}.cached"] = (get(path, False), 1)
+    return benchmarks
+
+
+def run(sizes: List[int], repeat: int, min_time: float, pattern: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for size in sizes:
+        matches = load_feed(size)["Value"]
+        benchmarks = {**function_benchmarks(matches), **http_benchmarks(matches)}
+        for name, (func, items) in benchmarks.items():
+            key = f"{name}[{size}]"
+            if pattern and not re.search(pattern, key):
+                continue
+            median, best = measure(func, repeat, min_time)
+            results[key] = {"median_s": median, "min_s": best, "items": items, "ns_per_item": median / max(items, 1) * 1e9}
+            print(f"{key:<40} {median * 1e3:10.3f} ms  {results[key]['ns_per_item']:12.0f} ns/élément", flush=True)
+    return results
+
+
+def metadata() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """Affiche le rapport nouveau / référence et renvoie les mesures plus lentes que la tolérance."""
+    regressions = []
+    print(f"\n{'benchmark':<40} {'référence':>12} {'actuel':>12} {'ratio':>8}")
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        ratio = result["median_s"] / reference["median_s"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  RÉGRESSION"
+            regressions.append(key)
+        elif ratio < 1 / (1 + tolerance):
+            flag = "  amélioration"
+        print(f"{key:<40} {reference['median_s'] * 1e3:10.3f}ms {result['median_s'] * 1e3:10.3f}ms {ratio:7.2f}x{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="nombres de matchs, séparés par des virgules")
+    parser.add_argument("--repeat", type=int, default=5, help="mesures par benchmark (médiane retenue)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="durée minimale d'une mesure, en secondes")
+    parser.add_argument("--filter", help="expression régulière sur le nom des benchmarks")
+    parser.add_argument("--output", help="fichier JSON où écrire les résultats")
+    parser.add_argument("--compare", help="fichier JSON de référence (produit par --output)")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="ralentissement relatif toléré avant de signaler une régression")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = run(sizes, args.repeat, args.min_time, args.filter)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": metadata(), "results": results}, f, indent=2)
+            f.write("\n")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} régression(s) au-delà de {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
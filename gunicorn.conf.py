@@ -0,0 +1,30 @@
+# Configuration gunicorn, lue automatiquement au lancement de `gunicorn app:app` depuis ce dossier
+import os
+import shutil
+import tempfile
+
+# Les pages gardent un flux SSE (/api/stream) ouvert jusqu'à SSE_MAX_DURATION secondes : un worker synchrone
+# serait bloqué par onglet, puis tué au bout de `timeout` faute de signe de vie pendant la réponse en flux.
+# Avec des threads, chaque flux n'occupe qu'un thread et le processus principal du worker reste joignable.
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 32))
+# Au plus un quart des threads pour les flux : le reste sert les autres requêtes. Les onglets en trop
+# reçoivent un 503 et rafraîchissent la page périodiquement, comme sans flux.
+os.environ.setdefault("SSE_MAX_STREAMS", str(threads // 4))
+
+# Dossiers créés par on_starting, supprimés à l'arrêt du maître
+_created = []
+
+
+def on_starting(server):
+    # Plusieurs workers : un seul récupère et analyse le flux, les autres lisent le snapshot partagé.
+    # Dossier propre à ce lancement (pid du maître) : jamais de snapshot laissé par un autre déploiement
+    if server.cfg.workers > 1 and "SHARED_SNAPSHOT_DIR" not in os.environ:
+        base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        os.environ["SHARED_SNAPSHOT_DIR"] = tempfile.mkdtemp(prefix=f"virtual-feed-{os.getpid()}-", dir=base)
+        _created.append(os.environ["SHARED_SNAPSHOT_DIR"])
+
+
+def on_exit(server):
+    for directory in _created:
+        shutil.rmtree(directory, ignore_errors=True)